@@ -0,0 +1,131 @@
+"""Request body size caps and upload type checks, enforced before the body is parsed"""
+import re
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+MULTIPART_BOUNDARY = re.compile(rb'^multipart/form-data;.*\bboundary="?([^";]+)"?', re.IGNORECASE)
+
+
+def multipart_boundary(scope: Scope) -> Optional[bytes]:
+    content_type = dict(scope["headers"]).get(b"content-type", b"")
+    match = MULTIPART_BOUNDARY.match(content_type)
+    return match.group(1) if match else None
+
+
+def first_file_part(prefix: bytes, boundary: bytes) -> Optional[Tuple[bytes, bool]]:
+    """Content of the first file part seen so far in a multipart body prefix.
+
+    Returns the content and whether the part is complete, or None while that
+    part's headers have not fully arrived.
+    """
+    delimiter = b"--" + boundary
+    position = 0
+    while (start := prefix.find(delimiter, position)) >= 0:
+        headers_end = prefix.find(b"\r\n\r\n", start)
+        if headers_end < 0:
+            return None
+        content_start = headers_end + 4
+        if b"filename=" in prefix[start:headers_end].lower():
+            end = prefix.find(b"\r\n" + delimiter, content_start)
+            return (prefix[content_start:], False) if end < 0 else (prefix[content_start:end], True)
+        position = content_start
+    return None
+
+
+class UploadSignatureMiddleware:
+    """Reject multipart uploads whose file does not start with a per-path signature.
+
+    The first file part is sniffed as the body arrives: without the
+    signature in its first ``window`` bytes the request fails with 400
+    there, before the multipart parser has spooled the rest of the upload.
+    Bodies whose file part does not show up within ``max_prefix`` bytes are
+    passed through unchecked.
+    """
+
+    def __init__(self, app: ASGIApp, signatures: Dict[str, Tuple[bytes, str]],
+                 window: int = 1024, max_prefix: int = 64 * 1024):
+        self.app = app
+        self.signatures = signatures
+        self.window = window
+        self.max_prefix = max_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        signature = self.signatures.get(scope["path"]) if scope["type"] == "http" else None
+        boundary = multipart_boundary(scope) if signature is not None else None
+        if boundary is None:
+            await self.app(scope, receive, send)
+            return
+
+        magic, detail = signature
+        prefix = b""
+        checked = False
+
+        async def sniffing_receive() -> Message:
+            nonlocal prefix, checked
+            message = await receive()
+            if checked or message["type"] != "http.request":
+                return message
+
+            prefix += message.get("body", b"")
+            more_body = message.get("more_body", False)
+            part = first_file_part(prefix, boundary)
+            if part is None:
+                checked = not more_body or len(prefix) > self.max_prefix
+            else:
+                content, complete = part
+                if magic in content[:self.window]:
+                    checked = True
+                elif len(content) >= self.window or complete or not more_body:
+                    checked = True
+                    # An empty file is left to the endpoint's own check
+                    if content:
+                        raise HTTPException(status_code=400, detail=detail)
+            if checked:
+                prefix = b""
+            return message
+
+        await self.app(scope, sniffing_receive, send)
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over a per-path byte limit with 413.
+
+    A Content-Length over the limit is answered before any of the body is
+    read. Chunked or under-declared bodies are counted as they arrive and
+    fail once they pass the limit, so the multipart parser never spools
+    more than the limit to disk.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the maximum size of {limit} bytes"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
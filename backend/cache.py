@@ -0,0 +1,186 @@
+"""Two-tier caches: an in-process LRU in front of a MongoDB collection"""
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from metrics import mongo_timer
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic differences produce the same key"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def content_hash(*parts: str) -> str:
+    """SHA-256 over the given parts, separated so ("ab", "c") != ("a", "bc")"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def estimate_size(value: Dict[str, Any]) -> int:
+    """Rough in-memory footprint of a cached dict, dominated by its strings"""
+    size = 64
+    for item in value.values():
+        if isinstance(item, str):
+            size += len(item)
+        elif isinstance(item, (list, tuple)):
+            size += sum(len(part) if isinstance(part, str) else 8 for part in item)
+        else:
+            size += 8
+    return size
+
+
+class LRUCache:
+    """In-memory LRU with per-entry expiry, bounded by entry count and optionally bytes"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[float, int, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int = 0) -> None:
+        if self.max_entries <= 0:
+            return
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self.size_bytes += size
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.size_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+
+
+class TieredCache:
+    """LRU cache backed by a MongoDB collection with a TTL index.
+
+    Values are plain dicts. Mongo failures are logged and treated as misses
+    so a degraded database never fails the request that consulted the cache.
+    """
+
+    # Stay well under MongoDB's 16MB document limit
+    MAX_PERSISTED_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: int, max_bytes: Optional[int] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(max_entries, ttl_seconds, max_bytes)
+        self.collection = None
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    async def start(self, collection) -> None:
+        """Attach the Mongo tier and make sure its TTL index exists"""
+        self.collection = collection
+        try:
+            await collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to create TTL index for {self.name} cache: {e}")
+
+    async def get(self, key: str, saved_bytes: int = 0) -> Optional[Dict[str, Any]]:
+        """Look a key up in memory, then Mongo.
+
+        ``saved_bytes`` is the size of the input a hit avoids reprocessing and
+        is accumulated into the ``bytes_saved`` stat.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            self.bytes_saved += saved_bytes
+            return value
+
+        if self.collection is not None:
+            try:
+                # The TTL monitor only runs once a minute, so filter stale rows ourselves
+                fresh_after = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+                async with mongo_timer(self.collection.name, "find_one"):
+                    document = await self.collection.find_one(
+                        {"_id": key, "created_at": {"$gt": fresh_after}}
+                    )
+            except Exception as e:
+                logger.warning(f"{self.name} cache lookup failed: {e}")
+                document = None
+
+            if document is not None:
+                self.mongo_hits += 1
+                self.bytes_saved += saved_bytes
+                self.memory.set(key, document["value"], estimate_size(document["value"]))
+                return document["value"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        size = estimate_size(value)
+        self.memory.set(key, value, size)
+
+        if self.collection is None or size > self.MAX_PERSISTED_BYTES:
+            return
+
+        try:
+            async with mongo_timer(self.collection.name, "replace_one"):
+                await self.collection.replace_one(
+                    {"_id": key},
+                    {"_id": key, "value": value, "created_at": datetime.utcnow()},
+                    upsert=True
+                )
+        except Exception as e:
+            logger.warning(f"Failed to persist {self.name} cache entry: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.mongo_hits
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.size_bytes,
+            "memory_evictions": self.memory.evictions,
+            "memory_hits": self.memory_hits,
+            "mongo_hits": self.mongo_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,211 @@
+"""Prompt input compaction and token budgeting ahead of LLM calls"""
+import logging
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from sections import section_name
+
+
+logger = logging.getLogger(__name__)
+
+# Rough OpenAI tokenizer ratio for English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+INVISIBLE_CHARACTERS = re.compile("[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+HORIZONTAL_SPACE = re.compile("[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+BLANK_LINE_RUNS = re.compile(r"\n{3,}")
+
+# "manage-\nment" -> "management"; only lowercase continuations, so "Jan-\nMar" stays
+LINE_BREAK_HYPHEN = re.compile(r"(?<=[A-Za-z])-\n[ \t]*(?=[a-z])")
+
+PAGE_NUMBER_LINE = re.compile(r"^(?:page\s*)?[-–(]?\s*\d{1,3}\s*(?:(?:of|/)\s*\d{1,3})?\s*[-–)]?$", re.IGNORECASE)
+
+# Lines that PDF exports repeat at the top or bottom of every page
+RUNNING_HEADER_HINTS = re.compile(
+    r"@|https?://|www\.|linkedin|github\.com|confidential|curriculum vitae|\bresume\b",
+    re.IGNORECASE
+)
+
+# A phone number has at least seven digits; year ranges are removed before matching
+# so identical "2019 - 2021" lines in two jobs are not mistaken for a footer
+PHONE_NUMBER = re.compile(r"\+?\(?\d(?:[\s().-]*\d){6,}")
+YEAR_RANGE = re.compile(r"\b(?:19|20)\d\d\s*[-–—]+\s*(?:(?:19|20)\d\d\b|present\b|current\b)", re.IGNORECASE)
+
+RESUME_BOILERPLATE_LINE = re.compile(r"^references\s+(?:are\s+)?available\s+(?:up)?on\s+request\.?$", re.IGNORECASE)
+
+# Equal-opportunity, accommodation and recruiting-agency paragraphs carry no role information
+JD_BOILERPLATE = re.compile(
+    r"equal (?:employment )?opportunity|without regard to|affirmative action|reasonable accommodation"
+    r"|protected veteran|e-verify|sexual orientation|gender identity|genetic information"
+    r"|unsolicited (?:resumes|applications)|recruitment agenc|third[- ]party recruiters"
+    r"|privacy (?:notice|policy)|fair chance|arrest (?:and|or) conviction",
+    re.IGNORECASE
+)
+
+JD_LOW_VALUE_HEADINGS = re.compile(
+    r"^(?:about us|about the company|who we are|our (?:story|mission|culture|values)"
+    r"|benefits|perks|perks (?:and|&) benefits|benefits (?:and|&) perks|what we offer|why join us|why work with us"
+    r"|compensation(?: and benefits)?|how to apply)\s*:?$",
+    re.IGNORECASE
+)
+
+RESUME_LOW_VALUE_SECTIONS = ("interests", "references")
+
+
+_encoding = None
+_encoding_loaded = False
+
+
+def count_tokens(text: str) -> int:
+    """Prompt tokens for ``text``: exact with tiktoken, a character estimate otherwise"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            logger.info("tiktoken not available; estimating prompt tokens from character counts")
+
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize_whitespace(text: str) -> str:
+    text = INVISIBLE_CHARACTERS.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    text = HORIZONTAL_SPACE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return BLANK_LINE_RUNS.sub("\n\n", text).strip()
+
+
+def dehyphenate(text: str) -> str:
+    return LINE_BREAK_HYPHEN.sub("", text)
+
+
+def is_running_header(line: str) -> bool:
+    return bool(RUNNING_HEADER_HINTS.search(line) or PHONE_NUMBER.search(YEAR_RANGE.sub(" ", line)))
+
+
+def remove_repeated_lines(text: str) -> str:
+    """Drop page numbers and repeated running headers/footers, keeping the first copy"""
+    lines = text.split("\n")
+    first_line = next((line for line in lines if line), "")
+    counts = Counter(line for line in lines if line)
+
+    kept = []
+    seen = set()
+    for line in lines:
+        if PAGE_NUMBER_LINE.match(line):
+            continue
+        if counts[line] > 1 and (line == first_line or is_running_header(line)):
+            if line in seen:
+                continue
+            seen.add(line)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def paragraphs(text: str) -> List[str]:
+    return [paragraph for paragraph in text.split("\n\n") if paragraph.strip()]
+
+
+def remove_jd_boilerplate(text: str) -> str:
+    return "\n\n".join(paragraph for paragraph in paragraphs(text) if not JD_BOILERPLATE.search(paragraph))
+
+
+def drop_jd_low_value_paragraphs(text: str) -> str:
+    """Remove company-background and benefits blocks, heading plus body"""
+    kept = []
+    skip_next = False
+    for paragraph in paragraphs(text):
+        first_line, _, rest = paragraph.partition("\n")
+        if skip_next:
+            skip_next = False
+            continue
+        if JD_LOW_VALUE_HEADINGS.match(first_line.strip()):
+            # A heading on its own line introduces the following paragraph
+            skip_next = not rest.strip()
+            continue
+        kept.append(paragraph)
+    return "\n\n".join(kept)
+
+
+def drop_resume_sections(text: str, names: Sequence[str]) -> str:
+    kept = []
+    dropping = False
+    for line in text.split("\n"):
+        heading = section_name(line)
+        if heading:
+            dropping = heading in names
+        if not dropping:
+            kept.append(line)
+    return BLANK_LINE_RUNS.sub("\n\n", "\n".join(kept)).strip()
+
+
+def truncate_paragraphs(text: str, max_tokens: int) -> str:
+    """Keep leading paragraphs of ``text`` within ``max_tokens`` (at least the first)"""
+    kept = []
+    used = 0
+    for paragraph in paragraphs(text):
+        tokens = count_tokens(paragraph)
+        if kept and used + tokens > max_tokens:
+            break
+        kept.append(paragraph)
+        used += tokens
+    return "\n\n".join(kept)
+
+
+def compact_resume(text: str) -> str:
+    lines = remove_repeated_lines(dehyphenate(normalize_whitespace(text))).split("\n")
+    return "\n".join(line for line in lines if not RESUME_BOILERPLATE_LINE.match(line))
+
+
+def compact_job_description(text: str) -> str:
+    return remove_jd_boilerplate(remove_repeated_lines(dehyphenate(normalize_whitespace(text))))
+
+
+def compact_prompt_inputs(resume_text: str, job_description: str,
+                          token_budget: Optional[int] = None) -> Dict[str, Any]:
+    """Shrink resume and job description before they go into the prompt.
+
+    Always: whitespace normalization, dehyphenation of line-break splits,
+    removal of page numbers and repeated running headers, and JD EEO /
+    recruiting boilerplate. If the pair is still over ``token_budget``,
+    low-value material is trimmed in order: JD company and benefits blocks,
+    resume interests/references sections, then trailing JD paragraphs.
+    Resume content is never truncated, since the model rewrites all of it.
+    """
+    compacted_resume = compact_resume(resume_text)
+    compacted_job = compact_job_description(job_description)
+
+    resume_tokens = count_tokens(compacted_resume)
+    job_tokens = count_tokens(compacted_job)
+    trimmed = []
+
+    if token_budget and resume_tokens + job_tokens > token_budget:
+        compacted_job = drop_jd_low_value_paragraphs(compacted_job)
+        job_tokens = count_tokens(compacted_job)
+        trimmed.append("job_description_low_value")
+
+    if token_budget and resume_tokens + job_tokens > token_budget:
+        compacted_resume = drop_resume_sections(compacted_resume, RESUME_LOW_VALUE_SECTIONS)
+        resume_tokens = count_tokens(compacted_resume)
+        trimmed.append("resume_low_value_sections")
+
+    if token_budget and resume_tokens + job_tokens > token_budget:
+        compacted_job = truncate_paragraphs(compacted_job, max(token_budget - resume_tokens, 0))
+        job_tokens = count_tokens(compacted_job)
+        trimmed.append("job_description_tail")
+
+    original_tokens = count_tokens(resume_text) + count_tokens(job_description)
+    return {
+        "resume_text": compacted_resume,
+        "job_description": compacted_job,
+        "original_tokens": original_tokens,
+        "prompt_tokens": resume_tokens + job_tokens,
+        "tokens_saved": max(original_tokens - resume_tokens - job_tokens, 0),
+        "trimmed": trimmed,
+    }
@@ -0,0 +1,327 @@
+"""Concurrency helpers shared by the API handlers"""
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException
+
+from metrics import mongo_timer
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key onto one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task. The task is shielded, so a caller that
+    disconnects does not cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Optional[Callable[[], Awaitable[T]]]) -> T:
+        """Await the in-flight call for ``key``, starting ``fn`` if there is none.
+
+        ``fn`` may be None when the caller has checked ``key in flight``.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.followers += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Best-effort detection of a provider 429 across client libraries"""
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "ratelimit" in message
+
+
+class SharedRateLimiter:
+    """Calls per time window, counted in MongoDB so every process shares one budget.
+
+    Each window is a counter document that callers ``$inc`` atomically, so
+    all gunicorn workers and replicas draw from the same quota, e.g. the
+    LLM provider's requests-per-minute limit for one API key. The current
+    count is blended with the previous window's (a sliding-window estimate)
+    so a burst straddling a window boundary cannot reach twice the limit.
+    Callers over budget retry with jitter for up to ``max_wait`` seconds and
+    then get a 503 with Retry-After. Mongo failures admit the call; the
+    per-process concurrency limiter still protects the upstream.
+    """
+
+    def __init__(self, name: str, limit: int, window_seconds: float, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_wait = max_wait
+        self.collection = None
+        self.admitted = 0
+        self.waited = 0
+        self.rejected = 0
+        self.errors = 0
+        # (window, count) of the last finished window, which no longer changes
+        self._previous: Tuple[int, int] = (-1, 0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0 and self.collection is not None
+
+    async def start(self, collection) -> None:
+        self.collection = collection
+        try:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"Failed to create TTL index for {self.name} rate limit: {e}")
+
+    async def acquire(self) -> None:
+        if not self.enabled:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        waited = False
+        while True:
+            try:
+                delay = await self._take()
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"{self.name} rate limit unavailable, admitting call: {e}")
+                return
+
+            if delay is None:
+                self.admitted += 1
+                if waited:
+                    self.waited += 1
+                return
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"{self.name} rate limit reached, please retry",
+                    headers={"Retry-After": str(max(1, math.ceil(delay)))}
+                )
+            waited = True
+            # Jitter keeps waiting workers from retrying in lockstep
+            await asyncio.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+
+    async def _take(self) -> Optional[float]:
+        """Take one call from the budget; None on success, else seconds to wait"""
+        from pymongo import ReturnDocument
+
+        position = time.time() / self.window_seconds
+        window = int(position)
+        key = f"{self.name}:{window}"
+        async with mongo_timer(self.collection.name, "find_one_and_update"):
+            current = await self.collection.find_one_and_update(
+                {"_id": key},
+                {
+                    "$inc": {"count": 1},
+                    "$setOnInsert": {"expires_at": datetime.utcfromtimestamp((window + 2) * self.window_seconds)}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+
+        if self._previous[0] != window - 1:
+            async with mongo_timer(self.collection.name, "find_one"):
+                previous = await self.collection.find_one({"_id": f"{self.name}:{window - 1}"})
+            self._previous = (window - 1, previous["count"] if previous else 0)
+
+        estimate = self._previous[1] * (1 - (position - window)) + current["count"]
+        if estimate <= self.limit:
+            return None
+
+        # Over budget: hand the call back so waiting does not inflate the count
+        async with mongo_timer(self.collection.name, "update_one"):
+            await self.collection.update_one({"_id": key}, {"$inc": {"count": -1}})
+        return self.window_seconds / self.limit
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "window_seconds": self.window_seconds,
+            "shared": self.enabled,
+            "admitted": self.admitted,
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD admission control for upstream calls.
+
+    The concurrency limit grows by ``1 / limit`` after each call that finishes
+    under ``target_latency`` and is multiplied by ``backoff_ratio`` after a
+    rate-limit error or a slow call (at most once per ``target_latency``, so
+    one burst of slow responses counts as a single congestion signal).
+    Callers over the limit wait in a FIFO queue; when the queue is full or
+    the wait exceeds ``queue_timeout`` they get a 503 with Retry-After.
+
+    The limit is per process. An optional ``rate_limiter`` is consulted
+    before a slot is taken, for quotas shared with other processes.
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int, target_latency: float,
+                 max_queue: int, queue_timeout: float, backoff_ratio: float = 0.5,
+                 rate_limiter: Optional[SharedRateLimiter] = None):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.backoff_ratio = backoff_ratio
+        self.rate_limiter = rate_limiter
+        self.in_flight = 0
+        self.avg_latency = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.throttled = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up"""
+        return max(1, math.ceil(self.avg_latency / max(self.limit, 1.0)))
+
+    def _overloaded(self, reason: str) -> HTTPException:
+        self.rejected += 1
+        return HTTPException(
+            status_code=503,
+            detail=f"Upstream LLM is at capacity ({reason}), please retry",
+            headers={"Retry-After": str(self.retry_after())}
+        )
+
+    async def acquire(self) -> None:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+        if self.in_flight < int(self.limit) and not self.queue_depth:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if self.queue_depth >= self.max_queue:
+            raise self._overloaded("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Granted a slot just as the deadline passed; hand it back
+                self._release_slot()
+            else:
+                waiter.cancel()
+            raise self._overloaded("queue timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            else:
+                waiter.cancel()
+            raise
+
+        self.admitted += 1
+
+    def release(self, latency: float, rate_limited: bool = False) -> None:
+        self.avg_latency = latency if not self.avg_latency else 0.9 * self.avg_latency + 0.1 * latency
+
+        now = time.monotonic()
+        if rate_limited or latency > self.target_latency:
+            if rate_limited:
+                self.throttled += 1
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one admitted slot, feeding latency and outcome back into the limit"""
+        await self.acquire()
+        start = time.monotonic()
+        rate_limited = False
+        try:
+            yield
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            raise
+        finally:
+            self.release(time.monotonic() - start, rate_limited)
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        async with self.slot():
+            return await fn()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "avg_latency": round(self.avg_latency, 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+        }
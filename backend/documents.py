@@ -0,0 +1,184 @@
+"""Parsed resume and job description structure, built once per text and shared by the endpoints"""
+import re
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cache import LRUCache, content_hash
+from keywords import STOPWORDS, load_lexicon, tokenize
+from sections import HEADER_SECTION, section_spans
+
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"\+?\(?\d[\d\s().-]{7,}\d")
+LINK_PATTERN = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin\.com|github\.com)/\S+", re.IGNORECASE)
+
+# A phone number has at least this many digits; fewer is usually a date range
+PHONE_MIN_DIGITS = 9
+
+CONTACT_KINDS = ("email", "phone", "link")
+
+UNKNOWN_TITLE = "Unknown Position"
+
+
+def detect_title(text: str) -> str:
+    """First short, non-sentence line among the opening lines of ``text``"""
+    for line in text.strip().split('\n')[:5]:
+        line = line.strip()
+        if 5 < len(line) < 100 and not line.endswith('.') and not line.startswith('http'):
+            return line
+    return UNKNOWN_TITLE
+
+
+def find_contact(text: str) -> Tuple[Tuple[str, str], ...]:
+    """(kind, value) pairs for the emails, phone numbers and links in ``text``"""
+    found = [("email", match.group()) for match in EMAIL_PATTERN.finditer(text)]
+    found += [
+        ("phone", match.group().strip()) for match in PHONE_PATTERN.finditer(text)
+        if sum(character.isdigit() for character in match.group()) >= PHONE_MIN_DIGITS
+    ]
+    found += [("link", match.group().rstrip('.,;)')) for match in LINK_PATTERN.finditer(text)]
+    return tuple(found)
+
+
+def skill_counts(tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Skills-lexicon matches in ``tokens`` as sorted term ids and their counts"""
+    ids, counts = np.unique(np.asarray(load_lexicon().match_tokens(tokens), dtype=np.int32), return_counts=True)
+    return ids.astype(np.int32), counts.astype(np.float32)
+
+
+class ParsedDocument:
+    """Everything the endpoints read from one resume or job description.
+
+    ``section_bounds`` holds (start, end) character offsets of each section
+    body in ``text`` as a flat array, aligned with ``section_names``.
+    ``terms`` are the document's content tokens, interned so documents share
+    one copy of each word. Skill matches are kept sparse: sorted lexicon term
+    ids with their counts, per document and per section.
+    """
+
+    __slots__ = (
+        "digest", "text", "title", "terms", "skill_ids", "skill_freqs",
+        "section_names", "section_bounds", "section_skill_ids", "contact"
+    )
+
+    def __init__(self, digest: str, text: str, title: str, terms: Tuple[str, ...],
+                 skill_ids: np.ndarray, skill_freqs: np.ndarray, section_names: Tuple[str, ...],
+                 section_bounds: array, section_skill_ids: Tuple[np.ndarray, ...],
+                 contact: Tuple[Tuple[str, str], ...]):
+        self.digest = digest
+        self.text = text
+        self.title = title
+        self.terms = terms
+        self.skill_ids = skill_ids
+        self.skill_freqs = skill_freqs
+        self.section_names = section_names
+        self.section_bounds = section_bounds
+        self.section_skill_ids = section_skill_ids
+        self.contact = contact
+
+    def skill_vector(self, size: int) -> np.ndarray:
+        """Dense term-count vector over a lexicon of ``size`` terms"""
+        vector = np.zeros(size, dtype=np.float32)
+        vector[self.skill_ids] = self.skill_freqs
+        return vector
+
+    def section_text(self, index: int) -> str:
+        return self.text[self.section_bounds[2 * index]:self.section_bounds[2 * index + 1]]
+
+    def contact_kinds(self) -> List[str]:
+        return [kind for kind in CONTACT_KINDS if any(found == kind for found, _ in self.contact)]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the document, for cache accounting"""
+        return (
+            len(self.text) + 8 * len(self.terms) + self.skill_ids.nbytes + self.skill_freqs.nbytes
+            + self.section_bounds.itemsize * len(self.section_bounds)
+            + sum(ids.nbytes for ids in self.section_skill_ids) + 256
+        )
+
+
+def parse_document(text: str, digest: Optional[str] = None) -> ParsedDocument:
+    """Tokenize ``text`` once and derive sections, terms, skills, contact details and title"""
+    names = []
+    bounds = array("I")
+    section_ids = []
+    terms: List[str] = []
+    all_ids = []
+    all_counts = []
+    contact: Tuple[Tuple[str, str], ...] = ()
+
+    for name, start, end in section_spans(text):
+        body = text[start:end]
+        tokens = tokenize(body)
+        ids, counts = skill_counts(tokens)
+        names.append(name)
+        bounds.extend((start, end))
+        section_ids.append(ids)
+        all_ids.append(ids)
+        all_counts.append(counts)
+        terms.extend(
+            sys.intern(token) for token in tokens
+            if len(token) > 1 and token not in STOPWORDS and not token.isdigit()
+        )
+        if name == HEADER_SECTION and not contact:
+            contact = find_contact(body)
+
+    if all_ids:
+        merged = np.concatenate(all_ids)
+        skill_ids, positions = np.unique(merged, return_inverse=True)
+        skill_freqs = np.bincount(positions, weights=np.concatenate(all_counts)).astype(np.float32)
+    else:
+        skill_ids, skill_freqs = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+    return ParsedDocument(
+        digest=digest or content_hash(text),
+        text=text,
+        title=detect_title(text),
+        terms=tuple(terms),
+        skill_ids=skill_ids.astype(np.int32),
+        skill_freqs=skill_freqs,
+        section_names=tuple(names),
+        section_bounds=bounds,
+        section_skill_ids=tuple(section_ids),
+        contact=contact
+    )
+
+
+class DocumentIndex:
+    """In-process LRU of parsed documents keyed by the hash of their text.
+
+    A resume or job description is parsed on first sight and every later
+    request that carries the same text, on any endpoint, reuses the result.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: Optional[int] = None):
+        self.documents = LRUCache(max_entries, ttl_seconds, max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> ParsedDocument:
+        digest = content_hash(text)
+        document = self.documents.get(digest)
+        if document is not None:
+            self.hits += 1
+            return document
+
+        self.misses += 1
+        document = parse_document(text, digest)
+        self.documents.set(digest, document, document.nbytes)
+        return document
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.documents),
+            "bytes": self.documents.size_bytes,
+            "evictions": self.documents.evictions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
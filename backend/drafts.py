@@ -0,0 +1,46 @@
+"""Instant resume drafts built from the keyword analysis, shown while the full LLM rewrite runs"""
+import re
+from typing import List
+
+from compaction import compact_resume
+from documents import ParsedDocument
+from keywords import load_lexicon, ranked_term_ids
+from sections import HEADER_SECTION
+
+
+DRAFT_SKILLS_LABEL = "Key skills for this role"
+
+
+def surface_form(names: List[str], text: str) -> str:
+    """How ``text`` writes a lexicon term ("AWS" rather than "aws"), else its canonical name"""
+    for name in names:
+        match = re.search(r"(?<![\w.+#-])" + re.escape(name) + r"(?![\w+#-])", text, re.IGNORECASE)
+        if match:
+            return match.group()
+    return names[0]
+
+
+def local_draft(resume: ParsedDocument, job: ParsedDocument, limit: int = 10) -> str:
+    """The resume, cleaned up, with the job's skills it already mentions listed under the header.
+
+    Only skills found in the resume are listed, so the draft never claims
+    anything the candidate did not write; the LLM rewrite replaces it.
+    """
+    lexicon = load_lexicon()
+    size = len(lexicon)
+    wanted = job.skill_vector(size)
+    present = resume.skill_vector(size) > 0
+    skills = [
+        surface_form(lexicon.names[index], resume.text)
+        for index in ranked_term_ids((wanted > 0) & present, wanted, limit)
+    ]
+    if not skills:
+        return compact_resume(resume.text)
+
+    skills_line = f"{DRAFT_SKILLS_LABEL}: {', '.join(skills)}"
+    if resume.section_names and resume.section_names[0] == HEADER_SECTION:
+        header_end = resume.section_bounds[1]
+        draft = f"{resume.text[:header_end].rstrip()}\n\n{skills_line}\n\n{resume.text[header_end:].lstrip()}"
+    else:
+        draft = f"{skills_line}\n\n{resume.text}"
+    return compact_resume(draft)
@@ -0,0 +1,48 @@
+"""Gunicorn settings for running the API on several uvicorn worker processes:
+
+    cd backend && gunicorn server:app -c gunicorn.conf.py
+
+WEB_CONCURRENCY sets the worker count (default: one per CPU) and BIND the
+listen address. The app is imported once in the master and forked, which is
+safe because the Mongo client, HTTP pools, PDF pool and job workers are all
+created per worker in the lifespan handler.
+
+State shared by all workers lives in MongoDB: the customization, section
+and PDF caches (behind each worker's in-memory tier), the job queue, and
+the LLM requests-per-minute budget (LLM_RATE_LIMIT_PER_MINUTE). The LLM
+concurrency limiter and single-flight coalescing stay per worker. Prometheus
+histograms and counters are aggregated across workers through
+PROMETHEUS_MULTIPROC_DIR.
+"""
+import multiprocessing
+import os
+import tempfile
+
+
+bind = os.environ.get("BIND", "0.0.0.0:8001")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Long LLM calls and streamed responses must not trip the worker heartbeat
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "180"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Split the CPUs between the workers' PDF pools instead of giving each worker all of them
+os.environ.setdefault("PDF_POOL_WORKERS", str(max(1, multiprocessing.cpu_count() // workers)))
+
+# Must exist before prometheus_client is imported, i.e. before the app is preloaded
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "resume-api-metrics"))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def on_starting(server):
+    # Metric files from a previous run would be summed into this one
+    for name in os.listdir(os.environ["PROMETHEUS_MULTIPROC_DIR"]):
+        os.remove(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], name))
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,268 @@
+"""MongoDB-backed job queue with leased, retryable asyncio workers"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from metrics import mongo_timer
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+TERMINAL_STATUSES = (COMPLETED, FAILED)
+
+
+class JobQueue:
+    """Durable work queue where a Mongo document is the source of truth for each job.
+
+    Workers claim the oldest available job with ``find_one_and_update``,
+    which sets a lease (``available_at = now + lease_seconds``) that a
+    heartbeat keeps extending while the handler runs. If a worker dies, its
+    lease lapses and the job becomes visible to other workers again, so
+    jobs survive restarts. Failed attempts are retried with linear backoff
+    up to ``max_attempts``. Finished jobs expire after ``result_ttl_seconds``.
+    """
+
+    def __init__(self, name: str, workers: int, lease_seconds: float, max_attempts: int,
+                 poll_interval: float, result_ttl_seconds: int, retry_backoff: float = 5.0):
+        self.name = name
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.result_ttl_seconds = result_ttl_seconds
+        self.retry_backoff = retry_backoff
+        self.collection = None
+        self.handler: Optional[Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = None
+        # Set in start(): with a preloaded app every forked worker shares this object's state
+        self.worker_id: Optional[str] = None
+        self.busy = 0
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.lease_lost = 0
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+
+    async def start(self, collection, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> None:
+        self.collection = collection
+        self.handler = handler
+        self.worker_id = uuid.uuid4().hex
+        # Bound to the running loop on first use, so a restart gets a fresh one
+        self._wakeup = asyncio.Event()
+        try:
+            await collection.create_index([("status", 1), ("available_at", 1)], name="claim_order")
+            await collection.create_index(
+                "finished_at", name="finished_ttl", expireAfterSeconds=self.result_ttl_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Failed to create {self.name} job indexes: {e}")
+
+        self._tasks = [asyncio.ensure_future(self._work(index)) for index in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop workers and hand back their leases so another process picks the jobs up"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self.collection is None:
+            return
+        try:
+            async with mongo_timer(self.collection.name, "update_many"):
+                await self.collection.update_many(
+                    {"status": RUNNING, "lease_owner": self.worker_id},
+                    {"$set": {"status": QUEUED, "available_at": datetime.utcnow(), "lease_owner": None}}
+                )
+        except Exception as e:
+            logger.warning(f"Failed to release {self.name} job leases: {e}")
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        now = datetime.utcnow()
+        job_id = str(uuid.uuid4())
+        async with mongo_timer(self.collection.name, "insert_one"):
+            await self.collection.insert_one({
+                "_id": job_id,
+                "status": QUEUED,
+                "payload": payload,
+                "attempts": 0,
+                "available_at": now,
+                "created_at": now,
+                "updated_at": now
+            })
+        self.enqueued += 1
+        self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        async with mongo_timer(self.collection.name, "find_one"):
+            return await self.collection.find_one({"_id": job_id}, {"payload": 0})
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Long-poll: return the job once it finishes or ``timeout`` elapses.
+
+        Completions in this process wake the waiter immediately; jobs run by
+        other processes are noticed by re-reading every ``poll_interval``.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        finished = self._finished.setdefault(job_id, asyncio.Event())
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            while True:
+                job = await self.get(job_id)
+                remaining = deadline - loop.time()
+                if job is None or job["status"] in TERMINAL_STATUSES or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(finished.wait(), min(self.poll_interval, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                del self._finished[job_id]
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        # pymongo arrives with the Mongo client; importing it here keeps it off the API import path
+        from pymongo import ReturnDocument
+
+        now = datetime.utcnow()
+        async with mongo_timer(self.collection.name, "find_one_and_update"):
+            return await self.collection.find_one_and_update(
+                # Queued jobs, plus running jobs whose lease expired with their worker
+                {"status": {"$in": [QUEUED, RUNNING]}, "available_at": {"$lte": now}},
+                {
+                    "$set": {
+                        "status": RUNNING,
+                        "lease_owner": self.worker_id,
+                        "available_at": now + timedelta(seconds=self.lease_seconds),
+                        "started_at": now,
+                        "updated_at": now
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("available_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+
+    async def _work(self, index: int) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.name} worker {index} failed to claim a job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.busy += 1
+            try:
+                await self._run(job)
+            finally:
+                self.busy -= 1
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        if job["attempts"] > self.max_attempts:
+            # Reclaimed after its lease expired once too often, e.g. a job that kills its worker
+            if await self._finish(job["_id"], {"status": FAILED, "error": "Job lease expired too many times"}):
+                self.failed += 1
+            return
+
+        heartbeat = asyncio.ensure_future(self._heartbeat(job["_id"]))
+        try:
+            result = await self.handler(job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._fail(job, e)
+            return
+        finally:
+            heartbeat.cancel()
+
+        finished = await self._finish(job["_id"], {"status": COMPLETED, "result": result})
+        if finished:
+            self.completed += 1
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with mongo_timer(self.collection.name, "update_one"):
+                    await self.collection.update_one(
+                        {"_id": job_id, "status": RUNNING, "lease_owner": self.worker_id},
+                        {"$set": {"available_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to extend lease on {self.name} job {job_id}: {e}")
+
+    async def _fail(self, job: Dict[str, Any], error: Exception) -> None:
+        if job["attempts"] < self.max_attempts:
+            self.retried += 1
+            logger.warning(f"{self.name} job {job['_id']} attempt {job['attempts']} failed, retrying: {error}")
+            await self._update_owned(job["_id"], {
+                "status": QUEUED,
+                "lease_owner": None,
+                "available_at": datetime.utcnow() + timedelta(seconds=self.retry_backoff * job["attempts"]),
+                "error": str(error)
+            })
+            return
+
+        logger.error(f"{self.name} job {job['_id']} failed after {job['attempts']} attempts: {error}")
+        if await self._finish(job["_id"], {"status": FAILED, "error": str(error)}):
+            self.failed += 1
+
+    async def _finish(self, job_id: str, fields: Dict[str, Any]) -> bool:
+        updated = await self._update_owned(job_id, {**fields, "lease_owner": None, "finished_at": datetime.utcnow()})
+        finished = self._finished.get(job_id)
+        if finished is not None:
+            finished.set()
+        return updated
+
+    async def _update_owned(self, job_id: str, fields: Dict[str, Any]) -> bool:
+        """Write the outcome only if this worker still holds the lease"""
+        try:
+            async with mongo_timer(self.collection.name, "update_one"):
+                outcome = await self.collection.update_one(
+                    {"_id": job_id, "status": RUNNING, "lease_owner": self.worker_id},
+                    {"$set": {**fields, "updated_at": datetime.utcnow()}}
+                )
+        except Exception as e:
+            logger.warning(f"Failed to record outcome of {self.name} job {job_id}: {e}")
+            return False
+
+        if not outcome.matched_count:
+            # The lease lapsed and another worker took the job over
+            self.lease_lost += 1
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "busy": self.busy,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "lease_lost": self.lease_lost,
+            "waiters": len(self._finished),
+        }
@@ -0,0 +1,196 @@
+"""Skills-lexicon keyword matching and term-frequency comparison"""
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+LEXICON_PATH = Path(__file__).parent / "data" / "skills_lexicon.txt"
+
+# Words plus the joiners that belong inside skill names ("node.js", "c++",
+# "t-sql", "m&a"). A leading dot is kept only at a word start, for ".net".
+# "/" is a token of its own so "ci/cd" matches while "react/redux" still
+# yields both skills.
+TOKEN_PATTERN = re.compile(r"(?:(?<![a-z0-9.])\.)?[a-z0-9]+(?:[.+#&-][a-z0-9]+)*[+#]*|/")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+STOPWORDS = frozenset("""
+a about above across after again against all also an and any are as at be because been before
+being below between both but by can could did do does doing down during each either etc few for
+from further had has have having he her here hers him his how i if in into is it its itself just
+may me more most must my no nor not of off on once only or other our ours out over own per plus
+same she should so some such than that the their theirs them then there these they this those
+through to too under until up upon us very via was we well were what when where which while who
+whom why will with within without would you your yours
+ability able candidate candidates including looking join role required requirements preferred
+strong work working years year experience team teams company job position responsibilities
+""".split())
+
+
+def content_tokens(text: str) -> List[str]:
+    """Tokens that carry meaning for matching: no stopwords, digits or separators"""
+    return [token for token in tokenize(text) if len(token) > 1 and token not in STOPWORDS and not token.isdigit()]
+
+
+class SkillsLexicon:
+    """Aho-Corasick automaton over token sequences of a skills lexicon.
+
+    Every canonical term and alias is tokenized with ``tokenize`` and added
+    to a trie whose edges are tokens, so a document is scanned in a single
+    pass after one regex tokenization. Overlapping matches resolve
+    leftmost-longest: "react native" counts once, not also as "react".
+    """
+
+    def __init__(self, entries: List[List[str]]):
+        self.terms: List[str] = []
+        # Canonical name and aliases of each term, as written in the lexicon
+        self.names: List[List[str]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per node: (term index, phrase length in tokens) for every phrase ending here
+        self._outputs: List[List[Tuple[int, int]]] = [[]]
+        seen = set()
+
+        for names in entries:
+            term_index = len(self.terms)
+            added = False
+            for name in names:
+                tokens = tuple(tokenize(name))
+                if not tokens or tokens in seen:
+                    continue
+                seen.add(tokens)
+                self._insert(tokens, term_index)
+                added = True
+            if added:
+                self.terms.append(names[0])
+                self.names.append(names)
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _insert(self, tokens: Tuple[str, ...], term_index: int) -> None:
+        node = 0
+        for token in tokens:
+            next_node = self._goto[node].get(token)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][token] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append((term_index, len(tokens)))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def match(self, text: str) -> List[int]:
+        """Term indices found in ``text``, one per non-overlapping occurrence"""
+        return self.match_tokens(tokenize(text))
+
+    def match_tokens(self, tokens: List[str]) -> List[int]:
+        """``match`` over text already split with ``tokenize``"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        candidates = []
+        node = 0
+        for position, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for term_index, length in outputs[node]:
+                candidates.append((position - length + 1, -length, term_index))
+
+        if not candidates:
+            return []
+
+        candidates.sort()
+        matches = []
+        covered_until = -1
+        for start, negative_length, term_index in candidates:
+            if start > covered_until:
+                matches.append(term_index)
+                covered_until = start - negative_length - 1
+        return matches
+
+    def term_counts(self, text: str) -> np.ndarray:
+        """Term-frequency vector of ``text`` over the lexicon"""
+        return np.bincount(
+            np.asarray(self.match(text), dtype=np.intp),
+            minlength=len(self.terms)
+        ).astype(np.float32)
+
+
+def parse_lexicon(lines) -> List[List[str]]:
+    """Entries of a lexicon file: canonical name first, then aliases"""
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        names = [name.strip() for name in line.split("|") if name.strip()]
+        if names:
+            entries.append(names)
+    return entries
+
+
+@lru_cache(maxsize=1)
+def load_lexicon(path: Path = LEXICON_PATH) -> SkillsLexicon:
+    """Build the automaton once per process"""
+    with open(path, encoding="utf-8") as lexicon_file:
+        return SkillsLexicon(parse_lexicon(lexicon_file))
+
+
+def ranked_term_ids(mask: np.ndarray, weights: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the terms selected by ``mask``, heaviest first, ties in lexicon order"""
+    indices = np.flatnonzero(mask)
+    order = np.argsort(-weights[indices], kind="stable")
+    return indices[order[:limit]]
+
+
+def ranked_terms(lexicon: SkillsLexicon, mask: np.ndarray, weights: np.ndarray, limit: int) -> List[str]:
+    return [lexicon.terms[index] for index in ranked_term_ids(mask, weights, limit)]
+
+
+def keyword_gap(before: np.ndarray, after: np.ndarray, jd: np.ndarray, limit: int = 10) -> Dict[str, Any]:
+    """Compare the lexicon term counts of both resume versions against the JD's.
+
+    ``coverage_before``/``coverage_after`` are the share of distinct JD terms
+    present in each resume, weighted by how often the JD mentions them.
+    ``keywords_added`` are JD terms that only the customized resume contains
+    and ``missing_keywords`` are JD terms it still lacks.
+    """
+    lexicon = load_lexicon()
+    wanted = jd > 0
+    jd_weight = float(jd.sum())
+
+    def coverage(resume: np.ndarray) -> float:
+        if not jd_weight:
+            return 0.0
+        return round(float(jd[wanted & (resume > 0)].sum()) / jd_weight, 3)
+
+    return {
+        "keywords_added": ranked_terms(lexicon, wanted & (after > 0) & (before == 0), jd, limit),
+        "missing_keywords": ranked_terms(lexicon, wanted & (after == 0), jd, limit),
+        "job_keywords": int(wanted.sum()),
+        "coverage_before": coverage(before),
+        "coverage_after": coverage(after),
+    }
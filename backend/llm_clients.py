@@ -0,0 +1,125 @@
+"""Shared LLM client factory, created once per process"""
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+
+if TYPE_CHECKING:
+    from emergentintegrations.llm.chat import LlmChat as LlmChatType, UserMessage as UserMessageType
+
+
+logger = logging.getLogger(__name__)
+
+# emergentintegrations pulls in litellm and the provider SDKs, which takes
+# seconds; they are bound here by load_llm_classes() on first use
+LlmChat = None
+UserMessage = None
+
+_load_lock = threading.Lock()
+
+
+def load_llm_classes() -> None:
+    """Import the chat classes once; safe to call from any thread"""
+    global LlmChat, UserMessage
+    with _load_lock:
+        if LlmChat is None:
+            from emergentintegrations.llm.chat import LlmChat
+        if UserMessage is None:
+            from emergentintegrations.llm.chat import UserMessage
+
+
+class LlmClientFactory:
+    """Hands out per-session chat handles that share one pooled HTTP client.
+
+    The API key, system prompt and model are resolved once instead of on
+    every request. ``start`` creates a keep-alive ``httpx.AsyncClient`` and
+    registers it as litellm's async session (emergentintegrations calls the
+    provider through litellm), so upstream connections are reused across
+    requests instead of being re-established per call.
+
+    The emergentintegrations/litellm import is deferred to ``load``, which
+    the app runs in a thread after startup and ``session`` runs on demand.
+    """
+
+    def __init__(self, api_key: Optional[str], system_message: str, provider: str, model: str,
+                 max_connections: int = 100, keepalive_expiry: float = 30.0, timeout: float = 120.0):
+        self.api_key = api_key
+        self.system_message = system_message
+        self.provider = provider
+        self.model = model
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.sessions_created = 0
+        self.loaded = False
+
+    def start(self) -> None:
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=self.timeout
+        )
+
+    def load(self) -> None:
+        """Import the LLM stack and point litellm at the pooled HTTP client"""
+        if self.loaded:
+            return
+
+        load_llm_classes()
+        try:
+            import litellm
+            litellm.aclient_session = self.http_client
+        except ImportError:
+            logger.warning("litellm not importable; LLM calls will not share the pooled HTTP client")
+        self.loaded = True
+
+    async def stop(self) -> None:
+        if self.http_client is None:
+            return
+
+        try:
+            import litellm
+            if litellm.aclient_session is self.http_client:
+                litellm.aclient_session = None
+        except ImportError:
+            pass
+
+        await self.http_client.aclose()
+        self.http_client = None
+        self.loaded = False
+
+    def session(self, session_id: str, model: Optional[str] = None) -> "LlmChatType":
+        """Lightweight chat handle carrying one session's message history.
+
+        ``model`` overrides the factory's model for this handle, e.g. a faster
+        one for drafts.
+        """
+        if not self.api_key:
+            raise HTTPException(status_code=500, detail="EMERGENT_LLM_KEY not configured")
+
+        self.load()
+        self.sessions_created += 1
+        return LlmChat(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=self.system_message
+        ).with_model(self.provider, model or self.model)
+
+    def message(self, text: str) -> "UserMessageType":
+        self.load()
+        return UserMessage(text=text)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "pooled_http_client": self.http_client is not None,
+            "loaded": self.loaded,
+            "sessions_created": self.sessions_created,
+        }
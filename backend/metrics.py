@@ -0,0 +1,122 @@
+"""Prometheus metrics and per-request stage timing"""
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+STAGE_SECONDS = Histogram(
+    "resume_customization_stage_seconds",
+    "Time spent in each stage of a resume customization request",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+PDF_BYTES = Histogram(
+    "pdf_upload_bytes",
+    "Size of uploaded PDFs",
+    buckets=(16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+)
+
+PDF_PAGES = Histogram(
+    "pdf_pages",
+    "Page count of uploaded PDFs",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+PDF_PARSE_SECONDS = Histogram(
+    "pdf_parse_seconds",
+    "Time to extract text from an uploaded PDF, including pool queueing",
+    buckets=LATENCY_BUCKETS
+)
+
+MONGO_SECONDS = Histogram(
+    "mongo_operation_seconds",
+    "Latency of MongoDB operations",
+    ["collection", "operation"],
+    buckets=LATENCY_BUCKETS
+)
+
+PROMPT_TOKENS = Histogram(
+    "llm_prompt_input_tokens",
+    "Tokens of resume and job description sent to the LLM after compaction",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+
+PROMPT_TOKENS_SAVED = Counter(
+    "llm_prompt_tokens_saved",
+    "Prompt tokens removed by input compaction before LLM calls"
+)
+
+
+class StageTimer:
+    """Records request stages into STAGE_SECONDS and renders a Server-Timing header"""
+
+    def __init__(self):
+        self.timings: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            STAGE_SECONDS.labels(name).observe(duration)
+            self.timings.append((name, duration))
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={duration * 1000:.1f}" for name, duration in self.timings)
+
+
+@asynccontextmanager
+async def mongo_timer(collection: str, operation: str):
+    """Time one awaited Mongo operation"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        MONGO_SECONDS.labels(collection, operation).observe(time.perf_counter() - start)
+
+
+class StatsCollector:
+    """Exports the numeric fields of registered ``stats()`` dicts as gauges"""
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, prefix: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        self._sources[prefix] = stats
+
+    def collect(self):
+        for prefix, stats in self._sources.items():
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                yield GaugeMetricFamily(f"{prefix}_{key}", f"{prefix} {key.replace('_', ' ')}", value=value)
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to expose on /metrics.
+
+    With PROMETHEUS_MULTIPROC_DIR set (gunicorn.conf.py sets it), histograms
+    and counters are written to per-process files and summed across workers
+    here. Subsystem gauges stay per process and describe the worker that
+    answered the scrape.
+    """
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(stats_collector)
+    return registry
@@ -0,0 +1,329 @@
+"""PDF text extraction on a process pool so parsing never blocks the event loop"""
+import asyncio
+import hashlib
+import io
+import mmap
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.managers import SyncManager
+from typing import TYPE_CHECKING, Any, AsyncIterator, BinaryIO, Callable, Dict, Iterator, Optional, Union
+
+from fastapi import HTTPException
+
+if TYPE_CHECKING:
+    # Imported on first use so the API process starts without loading it
+    import PyPDF2
+
+
+# Every PDF starts with this header, within its first kilobyte
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+
+# A PDF given as a str is the path of a spooled upload; bytes are the file itself
+PDFSource = Union[bytes, str]
+
+
+class PDFExtractionError(ValueError):
+    """Raised inside pool workers when a PDF cannot be parsed or breaks a guard"""
+
+
+class PDFTooLargeError(PDFExtractionError):
+    """Raised while spooling an upload that goes over the size limit"""
+
+
+def spool_pdf(upload: BinaryIO, directory: Optional[str], max_bytes: int,
+              chunk_size: int) -> tuple[str, int, str]:
+    """Copy an upload to a temp file chunk by chunk, checking the header and size as it goes.
+
+    Returns the temp file path, the size and the SHA-256 of the content; the
+    caller removes the file. At most one chunk is held in memory. The header
+    check here runs after the multipart parser has received the whole upload;
+    /api/extract-pdf rejects most non-PDFs earlier in UploadSignatureMiddleware.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    spooled = tempfile.NamedTemporaryFile(prefix="upload-", suffix=".pdf", dir=directory, delete=False)
+    try:
+        with spooled:
+            while chunk := upload.read(chunk_size):
+                if size == 0 and PDF_MAGIC not in chunk[:PDF_MAGIC_WINDOW]:
+                    raise PDFExtractionError("File is not a PDF")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise PDFTooLargeError(f"PDF exceeds the maximum size of {max_bytes} bytes")
+                digest.update(chunk)
+                spooled.write(chunk)
+        if size == 0:
+            raise PDFExtractionError("File is empty")
+    except BaseException:
+        os.remove(spooled.name)
+        raise
+    return spooled.name, size, digest.hexdigest()
+
+
+def map_pdf(path: str) -> mmap.mmap:
+    """Read-only memory map of a spooled PDF, so parsing reads the file without copying it"""
+    with open(path, "rb") as pdf_file:
+        return mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def close_pdf(pdf_reader: "PyPDF2.PdfReader") -> None:
+    """Release the memory map behind a reader opened from a path"""
+    if isinstance(pdf_reader.stream, mmap.mmap):
+        pdf_reader.stream.close()
+
+
+def open_pdf(source: PDFSource, page_limit: int, max_pages: Optional[int] = None) -> tuple["PyPDF2.PdfReader", int]:
+    """Open a PDF and enforce the page guard on the pages that will actually be read"""
+    import PyPDF2
+
+    stream = map_pdf(source) if isinstance(source, str) else io.BytesIO(source)
+    try:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        page_count = len(pdf_reader.pages)
+    except BaseException:
+        stream.close()
+        raise
+
+    pages_to_read = page_count if max_pages is None else min(page_count, max_pages)
+    if pages_to_read > page_limit:
+        stream.close()
+        raise PDFExtractionError(f"PDF has {page_count} pages; at most {page_limit} are supported")
+
+    return pdf_reader, page_count
+
+
+def iter_pdf_text(pdf_reader: "PyPDF2.PdfReader", max_pages: Optional[int] = None,
+                  max_chars: Optional[int] = None) -> Iterator[str]:
+    """Yield page text lazily, stopping after max_pages pages or max_chars characters"""
+    remaining = max_chars
+    for index, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and index >= max_pages:
+            return
+
+        text = page.extract_text() or ""
+        if remaining is not None:
+            text = text[:remaining]
+            remaining -= len(text)
+
+        yield text
+
+        if remaining is not None and remaining <= 0:
+            return
+
+
+def extract_pdf_text(source: PDFSource, page_limit: int, max_pages: Optional[int] = None,
+                     max_chars: Optional[int] = None) -> tuple[str, int, bool]:
+    """Extract text from PDF content or a spooled upload's path (runs inside a pool worker).
+
+    Returns the text, the document's total page count and whether extraction
+    stopped early because of ``max_pages`` or ``max_chars``.
+    """
+    try:
+        pdf_reader, page_count = open_pdf(source, page_limit, max_pages)
+        try:
+            pages = list(iter_pdf_text(pdf_reader, max_pages, max_chars))
+        finally:
+            close_pdf(pdf_reader)
+        char_count = sum(len(text) for text in pages)
+        truncated = len(pages) < page_count or (max_chars is not None and char_count >= max_chars)
+
+        return "\n".join(pages).strip(), page_count, truncated
+    except PDFExtractionError:
+        raise
+    except Exception as e:
+        # Re-raise as a plain error type so it always pickles back to the parent
+        raise PDFExtractionError(str(e))
+
+
+def stream_pdf_text(source: PDFSource, page_limit: int, max_pages: Optional[int], max_chars: Optional[int],
+                    pages: "queue.Queue") -> None:
+    """Put page text on ``pages`` as each page is extracted (runs inside a pool worker).
+
+    Sends ``("open", page_count)``, then ``("page", text)`` per page and
+    ``("done", None)``; a failure is sent as ``("error", message)`` instead.
+    """
+    try:
+        pdf_reader, page_count = open_pdf(source, page_limit, max_pages)
+        try:
+            pages.put(("open", page_count))
+            for text in iter_pdf_text(pdf_reader, max_pages, max_chars):
+                pages.put(("page", text))
+        finally:
+            close_pdf(pdf_reader)
+    except Exception as e:
+        pages.put(("error", str(e)))
+        return
+    pages.put(("done", None))
+
+
+def _warm_up() -> None:
+    """Job used to spawn workers and import PyPDF2 at startup"""
+    import PyPDF2  # noqa: F401
+
+
+class PDFExtractionPool:
+    """Bounded process pool with per-job timeouts and size/page guards"""
+
+    def __init__(self, max_workers: int, max_queue: int, timeout_seconds: float,
+                 max_bytes: int, max_pages: int, spool_dir: Optional[str] = None,
+                 chunk_size: int = 1024 * 1024):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        # Uploads are spooled here and handed to workers by path
+        self.spool_dir = spool_dir
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Serves the queues that streamed extractions send pages back on
+        self._manager: Optional[SyncManager] = None
+        # Jobs submitted to the pool and not yet finished by a worker. A job
+        # whose caller timed out keeps counting until the worker is done with it.
+        self.queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def start(self) -> None:
+        # spawn rather than fork: the parent runs an event loop and Mongo threads
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        for _ in range(self.max_workers):
+            self._executor.submit(_warm_up)
+        self._manager = context.Manager()
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def check_size(self, source: PDFSource) -> None:
+        # Spooled uploads were checked while they were copied
+        if isinstance(source, bytes) and len(source) > self.max_bytes:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=413,
+                detail=f"PDF exceeds the maximum size of {self.max_bytes} bytes"
+            )
+
+    async def spool(self, upload: BinaryIO) -> tuple[str, int, str]:
+        """Copy an upload to a temp file off the event loop; path, size and SHA-256 digest"""
+        try:
+            return await asyncio.to_thread(spool_pdf, upload, self.spool_dir, self.max_bytes, self.chunk_size)
+        except PDFTooLargeError as e:
+            self.rejected += 1
+            raise HTTPException(status_code=413, detail=str(e))
+        except PDFExtractionError as e:
+            self.rejected += 1
+            raise HTTPException(status_code=400, detail=str(e))
+
+    async def extract(self, source: PDFSource, max_pages: Optional[int] = None,
+                      max_chars: Optional[int] = None) -> tuple[str, int, bool]:
+        """Parse a PDF in the pool, mapping guard violations to HTTP errors.
+
+        Pass spooled uploads by path: the worker maps the file instead of the
+        content being pickled across the process boundary.
+        """
+        self.check_size(source)
+        job = self._submit(extract_pdf_text, source, self.max_pages, max_pages, max_chars)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail="PDF extraction timed out")
+        except PDFExtractionError as e:
+            self.failed += 1
+            raise HTTPException(status_code=400, detail=f"Failed to extract PDF text: {str(e)}")
+
+    async def stream(self, source: PDFSource, max_pages: Optional[int] = None,
+                     max_chars: Optional[int] = None) -> tuple[int, AsyncIterator[str]]:
+        """Parse a PDF in the pool and hand its text back page by page.
+
+        Takes a queue slot like ``extract`` and the timeout covers the whole
+        document. Returns the page count once the worker has opened the PDF,
+        and an async iterator of page text that raises HTTPException if a
+        later page fails or the deadline passes.
+        """
+        self.check_size(source)
+        if self._manager is None:
+            raise HTTPException(status_code=503, detail="PDF extraction is not available")
+
+        deadline = time.monotonic() + self.timeout_seconds
+        pages = await asyncio.to_thread(self._manager.Queue)
+        self._submit(stream_pdf_text, source, self.max_pages, max_pages, max_chars, pages)
+
+        kind, value = await self._receive(pages, deadline)
+        if kind == "error":
+            self.failed += 1
+            raise HTTPException(status_code=400, detail=f"Failed to extract PDF text: {value}")
+        return value, self._iter_pages(pages, deadline)
+
+    async def _iter_pages(self, pages: "queue.Queue", deadline: float) -> AsyncIterator[str]:
+        while True:
+            kind, value = await self._receive(pages, deadline)
+            if kind == "done":
+                return
+            if kind == "error":
+                self.failed += 1
+                raise HTTPException(status_code=400, detail=f"Failed to extract PDF text: {value}")
+            yield value
+
+    async def _receive(self, pages: "queue.Queue", deadline: float) -> tuple[str, Any]:
+        # The wait blocks a thread on the manager's socket, not on parsing
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise queue.Empty
+            return await asyncio.to_thread(pages.get, True, remaining)
+        except queue.Empty:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail="PDF extraction timed out")
+
+    def _submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        """Queue a job on the pool, or 503 when the pool is down or its queue is full"""
+        if self._executor is None:
+            raise HTTPException(status_code=503, detail="PDF extraction is not available")
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="PDF extraction queue is full, please retry")
+
+        loop = asyncio.get_running_loop()
+        job = self._executor.submit(function, *args)
+        self.queue_depth += 1
+        job.add_done_callback(lambda _: self._notify_finished(loop))
+        return job
+
+    def _notify_finished(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Runs on the executor's management thread
+        try:
+            loop.call_soon_threadsafe(self._job_finished)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _job_finished(self) -> None:
+        self.queue_depth -= 1
+        self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
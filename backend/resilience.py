@@ -0,0 +1,328 @@
+"""Deadlines, retries, hedging and circuit breaking for upstream calls"""
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set, TypeVar
+
+from fastapi import HTTPException
+
+from concurrency import AdaptiveConcurrencyLimiter, is_rate_limit_error
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Exception class names used by openai/litellm/httpx for failures worth retrying
+TRANSIENT_ERROR_NAMES = (
+    "Timeout", "APIConnectionError", "ConnectError", "ReadError", "RemoteProtocolError",
+    "ServiceUnavailable", "InternalServerError", "BadGateway", "APIError"
+)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Best-effort detection of failures a retry may fix: timeouts, dropped connections, 5xx, 429"""
+    if isinstance(error, HTTPException):
+        # Raised by our own admission control, not by the upstream
+        return False
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if is_rate_limit_error(error):
+        return True
+    return any(name in type(error).__name__ for name in TRANSIENT_ERROR_NAMES)
+
+
+class CircuitBreaker:
+    """Fail fast while an upstream keeps failing.
+
+    After ``failure_threshold`` consecutive transient failures the breaker
+    opens and callers get a 503 with Retry-After for ``recovery_seconds``.
+    Then one caller per ``recovery_seconds`` is let through as a probe
+    (half-open); its success closes the breaker, its failure reopens it.
+
+    ``check()`` admits a call and may hand it the probe, so its caller must
+    report the outcome with ``record_success``/``record_failure``, or
+    ``abandon`` the probe when the call ends without reaching the upstream.
+    Paths that only want to know whether to try use the read-only ``allow()``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.short_circuited = 0
+        # While open or half-open: when the next probe may go through
+        self._retry_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def allow(self) -> bool:
+        """Whether ``check()`` would admit a call now; never takes the probe"""
+        return self.state == self.CLOSED or time.monotonic() >= self._retry_at
+
+    def check(self) -> bool:
+        """Admit a call, or raise 503 while the breaker is open; True if the call is the probe"""
+        if self.state == self.CLOSED:
+            return False
+
+        now = time.monotonic()
+        if now < self._retry_at:
+            self.short_circuited += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} is unavailable, please retry",
+                headers={"Retry-After": str(max(1, math.ceil(self._retry_at - now)))}
+            )
+        # Let this caller probe; everyone else keeps failing fast until the next window
+        self.state = self.HALF_OPEN
+        self._retry_at = now + self.recovery_seconds
+        return True
+
+    def abandon(self) -> None:
+        """Give the probe back when it ended without an upstream outcome, so the next caller probes"""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+            self._retry_at = time.monotonic()
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if not self.enabled:
+            return
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            logger.warning(f"{self.name} circuit opened after {self.consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened += 1
+            self._retry_at = time.monotonic() + self.recovery_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class ResilientCaller:
+    """Run idempotent upstream calls under a deadline, with retries, hedging and a circuit breaker.
+
+    ``call(fn)`` starts ``fn()`` as one attempt, limited to
+    ``attempt_timeout`` and to what is left of ``deadline_seconds``.
+    Transient failures (see ``is_transient_error``) are retried up to
+    ``max_retries`` times after a full-jitter exponential backoff. With
+    ``hedge_percentile`` set, an attempt still running after that percentile
+    of recent upstream latencies gets a second, concurrent copy when the
+    limiter has a free slot; whichever answers first wins and the other is
+    cancelled. Every attempt runs through ``limiter``, so retries and hedges
+    count against the same concurrency limit as first attempts.
+
+    ``fn`` must be safe to run more than once, and concurrently.
+    """
+
+    def __init__(self, name: str, breaker: CircuitBreaker, deadline_seconds: float,
+                 attempt_timeout: float, max_retries: int, backoff_seconds: float,
+                 backoff_max_seconds: float, hedge_percentile: float = 0.0,
+                 hedge_min_samples: int = 20, limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 latency_window: int = 200):
+        self.name = name
+        self.breaker = breaker
+        self.deadline_seconds = deadline_seconds
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.limiter = limiter
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which an attempt is hedged, or None when hedging is off"""
+        if self.hedge_percentile <= 0 or len(self.latencies) < self.hedge_min_samples:
+            return None
+        if self.breaker.state != CircuitBreaker.CLOSED:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(self.hedge_percentile / 100 * len(ordered)))]
+
+    def backoff(self, retry: int) -> float:
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** retry))
+
+    def _has_spare_capacity(self) -> bool:
+        if self.limiter is None:
+            return True
+        return not self.limiter.queue_depth and self.limiter.in_flight < int(self.limiter.limit)
+
+    async def _timed(self, fn: Callable[[], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        result = await fn()
+        self.latencies.append(time.monotonic() - start)
+        return result
+
+    async def _run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        if self.limiter is None:
+            return await self._timed(fn)
+        return await self.limiter.run(lambda: self._timed(fn))
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], deadline: float) -> T:
+        """One attempt, plus a hedged copy if it runs long; raises TimeoutError at its end"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        end = min(now + self.attempt_timeout, deadline)
+        hedge_delay = self.hedge_delay()
+        hedge_at = now + hedge_delay if hedge_delay is not None else None
+
+        primary = asyncio.ensure_future(self._run(fn))
+        pending: Set[asyncio.Future] = {primary}
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                if not pending:
+                    raise error
+                now = loop.time()
+                if now >= end:
+                    raise asyncio.TimeoutError()
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if self._has_spare_capacity():
+                        self.hedges += 1
+                        pending.add(asyncio.ensure_future(self._run(fn)))
+                    continue
+
+                wake = end if hedge_at is None else min(end, hedge_at)
+                done, pending = await asyncio.wait(pending, timeout=wake - now, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Result of the first successful attempt of ``fn``, or an HTTP error once retries run out"""
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+        retry = 0
+        while True:
+            probe = self.breaker.check()
+            try:
+                result = await self._attempt(fn, deadline)
+            except Exception as e:
+                transient = is_transient_error(e)
+                # Throttling means the upstream is up; the limiter already backs off for it
+                if transient and not is_rate_limit_error(e):
+                    self.breaker.record_failure()
+                elif probe:
+                    self.breaker.abandon()
+                if isinstance(e, HTTPException):
+                    raise
+
+                delay = self.backoff(retry)
+                if not transient or retry >= self.max_retries or loop.time() + delay >= deadline:
+                    raise self._failed(e, transient)
+
+                retry += 1
+                self.retries += 1
+                logger.warning(f"{self.name} attempt failed ({e!r}); retry {retry} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled, e.g. the client went away
+                if probe:
+                    self.breaker.abandon()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, chunks: AsyncIterator[T], probe: bool = False) -> AsyncIterator[T]:
+        """Relay a streamed response under the deadline, reporting its outcome to the breaker.
+
+        Chunks already sent cannot be taken back, so streams are neither
+        retried nor hedged; each chunk must arrive within ``attempt_timeout``.
+        Call ``breaker.check()`` before opening the stream and pass on
+        whether it made this stream the probe.
+        """
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+        try:
+            while True:
+                timeout = max(0.0, min(self.attempt_timeout, deadline - loop.time()))
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        except Exception as e:
+            if is_transient_error(e) and not is_rate_limit_error(e):
+                self.breaker.record_failure()
+            elif probe:
+                self.breaker.abandon()
+            self.failures += 1
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+                raise HTTPException(status_code=504, detail=f"{self.name} timed out") from e
+            raise
+        except BaseException:
+            # Closed early, e.g. the client disconnected mid-stream
+            if probe:
+                self.breaker.abandon()
+            raise
+        self.breaker.record_success()
+
+    def _failed(self, error: Exception, transient: bool) -> Exception:
+        self.failures += 1
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+            return HTTPException(status_code=504, detail=f"{self.name} timed out")
+        if transient:
+            return HTTPException(status_code=502, detail=f"{self.name} request failed: {error}")
+        # Not an upstream outage (e.g. a bad request); surface it as before
+        return error
+
+    def stats(self) -> Dict[str, Any]:
+        hedge_delay = self.hedge_delay()
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_after": round(hedge_delay, 3) if hedge_delay is not None else None,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "breaker": self.breaker.stats(),
+        }
@@ -0,0 +1,119 @@
+"""Local resume/job-description match scoring with BM25 and TF-IDF"""
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from documents import ParsedDocument
+from keywords import load_lexicon, ranked_terms
+from sections import STANDARD_SECTIONS
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Share of the match score taken by skills-lexicon coverage; BM25 supplies the rest
+SKILLS_WEIGHT = 0.6
+
+
+def term_frequency_matrix(documents: Sequence[Sequence[str]]) -> np.ndarray:
+    """Dense (documents x vocabulary) count matrix over the documents' own vocabulary"""
+    vocabulary: Dict[str, int] = {}
+    ids = [
+        np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for token in tokens), dtype=np.intp)
+        for tokens in documents
+    ]
+    size = max(len(vocabulary), 1)
+    return np.vstack([np.bincount(doc_ids, minlength=size) for doc_ids in ids]).astype(np.float32)
+
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def score_resume(resume: ParsedDocument, job_descriptions: List[ParsedDocument], limit: int = 10) -> Dict[str, Any]:
+    """Score one parsed resume against every parsed job description in one vectorized pass.
+
+    Per job description:
+
+    * ``keyword_coverage``: share of the JD's skills-lexicon mentions the
+      resume covers.
+    * ``bm25``: BM25 of the resume with the JD's words as the query,
+      normalized by the score of a same-length resume mentioning every
+      query term once (capped at 1). IDF comes from the submitted job
+      descriptions, so words every posting uses weigh little when ranking
+      many postings.
+    * ``similarity``: cosine of the TF-IDF vectors.
+    * ``match_score``: 0-100 blend of keyword coverage and BM25.
+    * ``section_coverage``: share of the JD's skill mentions found in
+      each resume section.
+    """
+    lexicon = load_lexicon()
+    size = len(lexicon)
+
+    # Skills: merge repeated headings into one row per section
+    section_rows: Dict[str, int] = {}
+    for name in resume.section_names:
+        section_rows.setdefault(name, len(section_rows))
+    section_names = list(section_rows)
+    section_skills = np.zeros((max(len(section_names), 1), size), dtype=np.float32)
+    for name, ids in zip(resume.section_names, resume.section_skill_ids):
+        section_skills[section_rows[name], ids] = 1.0
+    resume_skills = resume.skill_vector(size)
+    jd_skills = np.vstack([jd.skill_vector(size) for jd in job_descriptions])
+
+    jd_skill_weight = jd_skills.sum(axis=1)
+    keyword_coverage = safe_divide(jd_skills @ (resume_skills > 0).astype(np.float32), jd_skill_weight)
+    section_coverage = safe_divide(section_skills @ jd_skills.T, jd_skill_weight[np.newaxis, :])
+
+    # Words: row 0 is the resume, the rest are the job descriptions
+    tf = term_frequency_matrix([resume.terms] + [jd.terms for jd in job_descriptions])
+    resume_tf, jd_tf = tf[0], tf[1:]
+    document_frequency = (jd_tf > 0).sum(axis=0)
+    jd_count = len(job_descriptions)
+    idf = np.log((jd_count - document_frequency + 0.5) / (document_frequency + 0.5) + 1.0).astype(np.float32)
+
+    lengths = tf.sum(axis=1)
+    average_length = lengths.mean() or 1.0
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[0] / average_length)
+    saturation = resume_tf * (BM25_K1 + 1) / (resume_tf + length_norm)
+    single_mention = (BM25_K1 + 1) / (1 + length_norm)
+    query = (jd_tf > 0).astype(np.float32)
+    bm25 = np.minimum(safe_divide(query @ (idf * saturation), query @ idf * single_mention), 1.0)
+
+    resume_vector = resume_tf * idf
+    jd_vectors = jd_tf * idf
+    similarity = safe_divide(
+        jd_vectors @ resume_vector,
+        np.linalg.norm(jd_vectors, axis=1) * np.linalg.norm(resume_vector)
+    )
+
+    match_score = np.where(
+        jd_skill_weight > 0,
+        SKILLS_WEIGHT * keyword_coverage + (1 - SKILLS_WEIGHT) * bm25,
+        bm25
+    ) * 100
+
+    present = resume_skills > 0
+    results = []
+    for index in range(jd_count):
+        wanted = jd_skills[index] > 0
+        results.append({
+            "index": index,
+            "match_score": round(float(match_score[index]), 1),
+            "keyword_coverage": round(float(keyword_coverage[index]), 3),
+            "bm25": round(float(bm25[index]), 3),
+            "similarity": round(float(similarity[index]), 3),
+            "matched_keywords": ranked_terms(lexicon, wanted & present, jd_skills[index], limit),
+            "missing_keywords": ranked_terms(lexicon, wanted & ~present, jd_skills[index], limit),
+            "section_coverage": {
+                name: round(float(section_coverage[row, index]), 3)
+                for row, name in enumerate(section_names)
+            },
+        })
+
+    return {
+        "sections": section_names,
+        "missing_sections": [name for name in STANDARD_SECTIONS if name not in section_rows],
+        "contact": resume.contact_kinds(),
+        "results": results,
+    }
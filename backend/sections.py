@@ -0,0 +1,135 @@
+"""Resume section detection from conventional headings"""
+import re
+from typing import Dict, List, Tuple
+
+
+SECTION_HEADINGS = {
+    "summary": (
+        "summary", "professional summary", "career summary", "executive summary", "profile",
+        "professional profile", "objective", "career objective", "about", "about me"
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history"
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "core competencies",
+        "competencies", "technologies", "tools and technologies", "skills and tools", "expertise"
+    ),
+    "education": ("education", "academic background", "education and training", "academics"),
+    "projects": ("projects", "personal projects", "key projects", "selected projects"),
+    "certifications": (
+        "certifications", "certificates", "licenses", "licenses and certifications",
+        "certifications and licenses"
+    ),
+    "awards": ("awards", "honors", "awards and honors", "achievements", "accomplishments"),
+    "publications": ("publications", "research"),
+    "volunteer": ("volunteer", "volunteering", "volunteer experience"),
+    "languages": ("languages",),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "references": ("references",),
+}
+
+# Sections an ATS expects to find on most resumes
+STANDARD_SECTIONS = ("summary", "experience", "skills", "education")
+
+# Text before the first recognized heading (name and contact details)
+HEADER_SECTION = "header"
+
+# Sections made of repeated entries (one job, one project) that are split further
+ENTRY_SECTIONS = ("experience", "projects", "volunteer")
+
+BULLET_LINE = re.compile(r"^\s*[-•*–·▪◦]\s")
+
+HEADING_DECORATION = re.compile(r"^[\s#*=_\-|•]+|[\s#*=_\-|•:]+$")
+
+
+def normalize_heading(line: str) -> str:
+    heading = HEADING_DECORATION.sub("", line).lower().replace("&", " and ")
+    return " ".join(heading.split())
+
+
+HEADING_LOOKUP: Dict[str, str] = {
+    normalize_heading(alias): name
+    for name, aliases in SECTION_HEADINGS.items()
+    for alias in aliases
+}
+
+
+def section_name(line: str) -> str:
+    """Canonical section for a heading line, or "" when it is not one"""
+    if len(line) > 50:
+        return ""
+    return HEADING_LOOKUP.get(normalize_heading(line), "")
+
+
+def section_spans(text: str) -> List[Tuple[str, int, int]]:
+    """Sections of a resume as (section, start, end) character offsets of each body.
+
+    Heading lines are left out of the bodies. Repeated headings produce
+    separate entries; text ahead of the first heading is ``HEADER_SECTION``.
+    """
+    spans = []
+    current = HEADER_SECTION
+    start = end = position = 0
+    has_lines = False
+    for raw_line in text.splitlines(keepends=True):
+        line = raw_line.splitlines()[0]
+        line_start = position
+        position += len(raw_line)
+        name = section_name(line)
+        if name:
+            if has_lines or current != HEADER_SECTION:
+                spans.append((current, start, end))
+            current = name
+            has_lines = False
+            start = end = position
+        else:
+            if not has_lines:
+                start = line_start
+                has_lines = True
+            end = line_start + len(line)
+
+    if has_lines or current != HEADER_SECTION:
+        spans.append((current, start, end))
+    return spans
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split a resume into (section, body) pairs in document order"""
+    return [(name, text[start:end]) for name, start, end in section_spans(text)]
+
+
+def split_blocks(text: str) -> List[str]:
+    """Split a resume into blocks that can be rewritten independently.
+
+    Each section is a block, except entry sections such as experience,
+    where every entry (a title line up to the end of its bullets) is its
+    own block. A heading stays attached to the first block of its section,
+    so joining the blocks with blank lines reproduces the resume.
+    """
+    blocks: List[str] = []
+    lines: List[str] = []
+    current = HEADER_SECTION
+    previous = ""
+
+    def flush():
+        block = "\n".join(lines).strip()
+        if block:
+            blocks.append(block)
+        lines.clear()
+
+    for line in text.splitlines():
+        name = section_name(line)
+        if name:
+            flush()
+            current = name
+        elif (current in ENTRY_SECTIONS and line.strip() and not BULLET_LINE.match(line)
+              and (not previous.strip() or BULLET_LINE.match(previous))
+              and any(not section_name(kept) and kept.strip() for kept in lines)):
+            flush()
+        lines.append(line)
+        previous = line
+
+    flush()
+    return blocks
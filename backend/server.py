@@ -1,31 +1,87 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Form, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
+from bson.errors import InvalidId
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+from contextlib import asynccontextmanager
 import uuid
+import json
+import base64
 from datetime import datetime
 import time
 import re
-import PyPDF2
-import io
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from cache import TieredCache, content_hash, normalize_text
+from concurrency import AdaptiveConcurrencyLimiter, SharedRateLimiter, SingleFlight, is_rate_limit_error
+from resilience import CircuitBreaker, ResilientCaller
+from pdf_extraction import PDF_MAGIC, PDF_MAGIC_WINDOW, PDFExtractionPool
+from body_limits import BodySizeLimitMiddleware, UploadSignatureMiddleware
+from llm_clients import LlmClientFactory
+from write_behind import WriteBehindBuffer
+from job_queue import JobQueue
+from keywords import keyword_gap, load_lexicon
+from documents import DocumentIndex
+from drafts import local_draft
+from scoring import score_resume
+from compaction import compact_prompt_inputs, count_tokens
+from sections import split_blocks
+from metrics import (
+    PDF_BYTES,
+    PDF_PAGES,
+    PDF_PARSE_SECONDS,
+    PROMPT_TOKENS,
+    PROMPT_TOKENS_SAVED,
+    StageTimer,
+    metrics_registry,
+    mongo_timer,
+    stats_collector
+)
+
+if TYPE_CHECKING:
+    from emergentintegrations.llm.chat import LlmChat, UserMessage
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, opened by the lifespan handler
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client = None
+db = None
+
+# Set once every startup step has run; /api/ready reports 503 until then
+app_ready = False
+
+
+def create_mongo_client():
+    """Connect to MongoDB; motor is imported here to keep it off the import path.
+
+    Called from the lifespan handler, so under gunicorn every worker opens its
+    own client after the fork instead of inheriting the master's sockets.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(mongo_url)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -44,6 +100,25 @@ class ResumeCustomizeRequest(BaseModel):
     resume_text: str
     job_description: str
     session_id: Optional[str] = None
+    incremental: bool = False  # /api/customize-resume only: re-run just the changed sections
+    draft: bool = False  # /api/customize-resume only: answer with a fast draft, full rewrite via final_job_id
+
+class ResumeBatchCustomizeRequest(BaseModel):
+    resume_text: str
+    job_descriptions: List[str]
+    session_id: Optional[str] = None
+    concurrency: Optional[int] = None
+
+class KeywordCoverage(BaseModel):
+    job_keywords: int
+    coverage_before: float
+    coverage_after: float
+    missing_keywords: List[str]
+
+class ResumeScoreRequest(BaseModel):
+    resume_text: str
+    job_description: Optional[str] = None
+    job_descriptions: Optional[List[str]] = None
 
 class ResumeCustomizeResponse(BaseModel):
     customized_resume: str
@@ -51,11 +126,28 @@ class ResumeCustomizeResponse(BaseModel):
     keywords_added: List[str]
     processing_time: float
     session_id: str
+    keyword_coverage: Optional[KeywordCoverage] = None
+    tokens_saved: int = 0
+    sections_reused: Optional[int] = None
+    sections_regenerated: Optional[int] = None
+    draft: bool = False
+    draft_source: Optional[str] = None  # "model" or "local"
+    final_job_id: Optional[str] = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    attempts: int
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[ResumeCustomizeResponse] = None
+    error: Optional[str] = None
 
 class PDFExtractionResponse(BaseModel):
     extracted_text: str
     filename: str
     page_count: int
+    truncated: bool = False
 
 class ProcessingHistory(BaseModel):
     session_id: str
@@ -66,14 +158,10 @@ class ProcessingHistory(BaseModel):
     keywords_added: List[str]
 
 
-# Initialize OpenAI client
-def create_llm_chat(session_id: str) -> LlmChat:
-    """Create an LLM chat instance with OpenAI GPT-4o"""
-    api_key = os.environ.get('EMERGENT_LLM_KEY')
-    if not api_key:
-        raise HTTPException(status_code=500, detail="EMERGENT_LLM_KEY not configured")
-    
-    system_message = """You are an expert ATS resume optimization specialist with deep knowledge of Applicant Tracking Systems and recruiting best practices. Your task is to analyze a resume against a specific job description and rewrite the resume to maximize ATS compatibility and hiring manager appeal while maintaining complete truthfulness.
+LLM_PROVIDER = "openai"
+LLM_MODEL = "gpt-4o"
+
+SYSTEM_MESSAGE = """You are an expert ATS resume optimization specialist with deep knowledge of Applicant Tracking Systems and recruiting best practices. Your task is to analyze a resume against a specific job description and rewrite the resume to maximize ATS compatibility and hiring manager appeal while maintaining complete truthfulness.
 
 Key Guidelines:
 1. Add relevant keywords naturally throughout the resume
@@ -88,68 +176,626 @@ Key Guidelines:
 10. Focus on accomplishments rather than just duties
 
 Your response should be ONLY the optimized resume text, formatted professionally and ready for both ATS scanning and human review."""
+
+USER_PROMPT_TEMPLATE = """RESUME:
+{resume_text}
+
+JOB DESCRIPTION:
+{job_description}
+
+Please optimize this resume for the above job description. Follow the guidelines provided in the system message and return ONLY the optimized resume text, formatted professionally and ready for ATS scanning."""
+
+SECTION_PROMPT_TEMPLATE = """Optimize only the resume sections below for the job description. The rest of the resume is unchanged and not shown.
+
+Each section starts with a marker line such as "### SECTION 1". Return every section in the same order, each starting with its original marker line followed by the optimized text of that section only. Do not add, merge, split or drop sections.
+
+JOB DESCRIPTION:
+{job_description}
+
+RESUME SECTIONS:
+{sections}"""
+
+SECTION_MARKER_PATTERN = re.compile(r"^### SECTION (\d+)[ \t]*$", re.MULTILINE)
+
+# Identical resume/job description pairs are answered from here instead of the LLM
+customization_cache = TieredCache(
+    name="customization",
+    max_entries=int(os.environ.get('CUSTOMIZE_CACHE_MAX_ENTRIES', '512')),
+    ttl_seconds=int(os.environ.get('CUSTOMIZE_CACHE_TTL_SECONDS', '86400'))
+)
+
+# Optimized resume sections for incremental re-customization, keyed by section and JD
+section_cache = TieredCache(
+    name="section",
+    max_entries=int(os.environ.get('SECTION_CACHE_MAX_ENTRIES', '4096')),
+    ttl_seconds=int(os.environ.get('SECTION_CACHE_TTL_SECONDS', '86400'))
+)
+
+# One factory per process: config is resolved once and upstream connections are pooled
+llm_factory = LlmClientFactory(
+    api_key=os.environ.get('EMERGENT_LLM_KEY'),
+    system_message=SYSTEM_MESSAGE,
+    provider=LLM_PROVIDER,
+    model=LLM_MODEL,
+    max_connections=int(os.environ.get('LLM_MAX_CONNECTIONS', '100')),
+    keepalive_expiry=float(os.environ.get('LLM_KEEPALIVE_SECONDS', '30'))
+)
+
+# Upstream requests per minute for the API key, shared by all workers through
+# MongoDB; 0 leaves rate limiting to the per-process limiter below
+llm_rate_limiter = SharedRateLimiter(
+    name="llm",
+    limit=int(os.environ.get('LLM_RATE_LIMIT_PER_MINUTE', '0')),
+    window_seconds=60,
+    max_wait=float(os.environ.get('LLM_QUEUE_TIMEOUT_SECONDS', '10'))
+)
+
+# Admission control for upstream LLM calls; the limit adapts to latency and 429s.
+# It is per process, so with several workers it applies to each of them.
+llm_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=int(os.environ.get('LLM_CONCURRENCY_INITIAL', '8')),
+    min_limit=int(os.environ.get('LLM_CONCURRENCY_MIN', '1')),
+    max_limit=int(os.environ.get('LLM_CONCURRENCY_MAX', '64')),
+    target_latency=float(os.environ.get('LLM_TARGET_LATENCY_SECONDS', '40')),
+    max_queue=int(os.environ.get('LLM_QUEUE_MAX', '100')),
+    queue_timeout=float(os.environ.get('LLM_QUEUE_TIMEOUT_SECONDS', '10')),
+    rate_limiter=llm_rate_limiter
+)
+
+# Deadline, retries, optional hedging and a circuit breaker around each
+# upstream LLM request; every attempt and hedge takes a limiter slot
+llm_breaker = CircuitBreaker(
+    "Upstream LLM",
+    failure_threshold=int(os.environ.get('LLM_BREAKER_FAILURES', '5')),
+    recovery_seconds=float(os.environ.get('LLM_BREAKER_RECOVERY_SECONDS', '30'))
+)
+llm_caller = ResilientCaller(
+    "Upstream LLM",
+    llm_breaker,
+    deadline_seconds=float(os.environ.get('LLM_DEADLINE_SECONDS', '120')),
+    attempt_timeout=float(os.environ.get('LLM_ATTEMPT_TIMEOUT_SECONDS', '60')),
+    max_retries=int(os.environ.get('LLM_MAX_RETRIES', '2')),
+    backoff_seconds=float(os.environ.get('LLM_RETRY_BACKOFF_SECONDS', '1')),
+    backoff_max_seconds=float(os.environ.get('LLM_RETRY_BACKOFF_MAX_SECONDS', '10')),
+    # e.g. 95 sends a second request once an attempt outlasts the p95 latency; 0 disables hedging
+    hedge_percentile=float(os.environ.get('LLM_HEDGE_PERCENTILE', '0')),
+    hedge_min_samples=int(os.environ.get('LLM_HEDGE_MIN_SAMPLES', '20')),
+    limiter=llm_limiter
+)
+
+# History listing: newest first, with _id breaking ties between equal timestamps
+HISTORY_SORT = [("created_at", -1), ("_id", -1)]
+HISTORY_PROJECTION = {"job_title": 1, "processing_time": 1, "keywords_added": 1, "created_at": 1}
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Status listing: oldest first, with id breaking ties between equal timestamps
+STATUS_SORT = [("timestamp", 1), ("id", 1)]
+STATUS_PROJECTION = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+STATUS_MAX_PAGE_SIZE = 1000
+
+# History rows are buffered and written in batches off the request path
+history_writer = WriteBehindBuffer(
+    name="processing_history",
+    max_batch=int(os.environ.get('HISTORY_FLUSH_BATCH', '100')),
+    flush_interval=float(os.environ.get('HISTORY_FLUSH_INTERVAL_SECONDS', '1.0')),
+    max_pending=int(os.environ.get('HISTORY_MAX_PENDING', '10000'))
+)
+
+# Customizations queued through /api/jobs run on these workers, not on the request
+customization_jobs = JobQueue(
+    name="customization",
+    workers=int(os.environ.get('JOB_WORKERS', '4')),
+    lease_seconds=float(os.environ.get('JOB_LEASE_SECONDS', '60')),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', '3')),
+    poll_interval=float(os.environ.get('JOB_POLL_INTERVAL_SECONDS', '1')),
+    result_ttl_seconds=int(os.environ.get('JOB_RESULT_TTL_SECONDS', str(7 * 86400)))
+)
+JOB_MAX_WAIT_SECONDS = int(os.environ.get('JOB_MAX_WAIT_SECONDS', '30'))
+
+# Emit a Server-Timing header with per-stage durations on customization responses
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+
+# Resume plus job description tokens allowed into the prompt before low-value
+# material is trimmed; 0 disables trimming (compaction itself always runs)
+PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', '6000'))
+
+# Import the LLM client libraries in the background right after startup
+# instead of on the first customization request
+LLM_PRELOAD = os.environ.get('LLM_PRELOAD', 'true').lower() == 'true'
+llm_preload: List[asyncio.Task] = []
+
+# How long /api/ready waits for a MongoDB ping before reporting not ready
+READY_MONGO_TIMEOUT_SECONDS = float(os.environ.get('READY_MONGO_TIMEOUT_SECONDS', '2'))
+
+# Draft mode: a faster model answers first (empty uses only the local keyword
+# draft) and falls back to the local draft if it is slower than the timeout
+DRAFT_LLM_MODEL = os.environ.get('DRAFT_LLM_MODEL', 'gpt-4o-mini')
+DRAFT_TIMEOUT_SECONDS = float(os.environ.get('DRAFT_TIMEOUT_SECONDS', '4'))
+# Reported under "drafts" in /api/admin/llm and as customization_drafts_* on /metrics
+draft_counts = {"model": 0, "local": 0, "final_cached": 0}
+
+# Parsed resumes and job descriptions, shared by every endpoint that reads the same text
+document_index = DocumentIndex(
+    max_entries=int(os.environ.get('DOCUMENT_INDEX_MAX_ENTRIES', '2048')),
+    ttl_seconds=int(os.environ.get('DOCUMENT_INDEX_TTL_SECONDS', '3600')),
+    max_bytes=int(os.environ.get('DOCUMENT_INDEX_MAX_BYTES', str(64 * 1024 * 1024)))
+)
+
+# Upper bound on keywords_added and missing_keywords in responses
+KEYWORDS_MAX = int(os.environ.get('KEYWORDS_MAX', '10'))
+
+# Concurrent identical customizations share a single upstream LLM call
+customization_flight = SingleFlight()
+
+# Fan-out limits for /api/customize-resume/batch
+BATCH_MAX_JOBS = int(os.environ.get('BATCH_MAX_JOBS', '50'))
+BATCH_DEFAULT_CONCURRENCY = int(os.environ.get('BATCH_DEFAULT_CONCURRENCY', '5'))
+BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', '10'))
+
+# Job descriptions accepted by one /api/score call
+SCORE_MAX_JOBS = int(os.environ.get('SCORE_MAX_JOBS', '200'))
+
+# PyPDF2 parsing is CPU-bound, so it runs in worker processes off the event loop
+pdf_pool = PDFExtractionPool(
+    max_workers=int(os.environ.get('PDF_POOL_WORKERS', str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.environ.get('PDF_POOL_MAX_QUEUE', '32')),
+    timeout_seconds=float(os.environ.get('PDF_TIMEOUT_SECONDS', '20')),
+    max_bytes=int(os.environ.get('PDF_MAX_BYTES', str(10 * 1024 * 1024))),
+    max_pages=int(os.environ.get('PDF_MAX_PAGES', '50')),
+    spool_dir=os.environ.get('PDF_SPOOL_DIR') or None,
+    chunk_size=int(os.environ.get('PDF_UPLOAD_CHUNK_BYTES', str(1024 * 1024)))
+)
+
+# Whole /api/extract-pdf request bodies: the PDF plus multipart framing
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(pdf_pool.max_bytes + 64 * 1024)))
+
+# Re-uploads of the same PDF are served by file digest instead of being re-parsed
+pdf_cache = TieredCache(
+    name="pdf",
+    max_entries=int(os.environ.get('PDF_CACHE_MAX_ENTRIES', '1024')),
+    ttl_seconds=int(os.environ.get('PDF_CACHE_TTL_SECONDS', str(7 * 86400))),
+    max_bytes=int(os.environ.get('PDF_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+)
+
+
+# Initialize OpenAI client
+def create_llm_chat(session_id: str) -> "LlmChat":
+    """Create an LLM chat instance with OpenAI GPT-4o"""
+    return llm_factory.session(session_id)
+
+
+async def send_llm_message(session_id: str, user_message: "UserMessage") -> str:
+    """Send one prompt through llm_caller.
+
+    Each attempt gets its own chat handle, so a retried or hedged request
+    does not see the history of the attempt it replaces.
+    """
+    return await llm_caller.call(lambda: create_llm_chat(session_id).send_message(user_message))
+
+
+def customization_cache_key(resume_text: str, job_description: str) -> str:
+    """Cache key covering everything that determines the LLM output"""
+    return content_hash(
+        normalize_text(resume_text),
+        normalize_text(job_description),
+        LLM_PROVIDER,
+        LLM_MODEL,
+        SYSTEM_MESSAGE,
+        USER_PROMPT_TEMPLATE
+    )
+
+
+def section_cache_key(section_text: str, job_description: str) -> str:
+    """Cache key for one rewritten resume section"""
+    return content_hash(
+        normalize_text(section_text),
+        normalize_text(job_description),
+        LLM_PROVIDER,
+        LLM_MODEL,
+        SYSTEM_MESSAGE,
+        SECTION_PROMPT_TEMPLATE
+    )
+
+
+def extract_job_title(job_description: str) -> str:
+    """Extract job title from job description"""
+    return document_index.get(job_description).title
+
+
+def analyze_improvements(original_resume: str, customized_resume: str,
+                         job_description: str) -> tuple[List[str], List[str], dict]:
+    """Analyze improvements made and keywords added, from skills-lexicon term frequencies"""
+    lexicon = load_lexicon()
+    gap = keyword_gap(
+        document_index.get(original_resume).skill_vector(len(lexicon)),
+        lexicon.term_counts(customized_resume),
+        document_index.get(job_description).skill_vector(len(lexicon)),
+        limit=KEYWORDS_MAX
+    )
+    keywords_added = gap["keywords_added"]
+    keyword_coverage = {
+        "job_keywords": gap["job_keywords"],
+        "coverage_before": gap["coverage_before"],
+        "coverage_after": gap["coverage_after"],
+        "missing_keywords": gap["missing_keywords"]
+    }
     
-    chat = LlmChat(
-        api_key=api_key,
-        session_id=session_id,
-        system_message=system_message
-    ).with_model("openai", "gpt-4o")
+    if not gap["job_keywords"]:
+        return ["No recognized skill keywords found in the job description"], keywords_added, keyword_coverage
+    
+    improvements = []
+    if keywords_added:
+        improvements.append(f"Added job description keywords: {', '.join(keywords_added)}")
     
-    return chat
+    before = round(gap["coverage_before"] * 100)
+    after = round(gap["coverage_after"] * 100)
+    if after > before:
+        improvements.append(f"Raised job description keyword coverage from {before}% to {after}%")
+    else:
+        improvements.append(f"Job description keyword coverage is {after}%")
+    
+    if gap["missing_keywords"]:
+        improvements.append(
+            f"Still missing from the job description (add only if accurate): {', '.join(gap['missing_keywords'])}"
+        )
+    
+    return improvements, keywords_added, keyword_coverage
 
 
-def extract_pdf_text(pdf_content: bytes) -> tuple[str, int]:
-    """Extract text from PDF content"""
+def validate_customize_inputs(resume_text: str, job_description: str) -> None:
+    """Reject customization requests with empty inputs"""
+    if not resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+    
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_llm_response(chat: "LlmChat", user_message: "UserMessage") -> AsyncIterator[str]:
+    """Yield completion text as the model generates it.
+
+    Chat clients exposing ``stream_message`` are streamed chunk by chunk;
+    others fall back to a single chunk once ``send_message`` returns. The
+    emergentintegrations LlmChat has no ``stream_message``, so in production
+    the completion arrives as one chunk and time to first token equals the
+    full completion time; incremental streaming needs a streaming-capable
+    chat client from the provider.
+    """
+    stream_message = getattr(chat, "stream_message", None)
+    if stream_message is None:
+        yield await chat.send_message(user_message)
+        return
+    
+    async for chunk in stream_message(user_message):
+        yield chunk
+
+
+def build_history_entry(session_id: str, resume_text: str, job_description: str,
+                        processing_time: float, keywords_added: List[str]) -> ProcessingHistory:
+    """Build the history row recorded for one customization"""
+    return ProcessingHistory(
+        session_id=session_id,
+        original_resume_preview=resume_text[:500],
+        job_title=extract_job_title(job_description),
+        processing_time=processing_time,
+        keywords_added=keywords_added
+    )
+
+
+def record_processing_history(session_id: str, resume_text: str, job_description: str,
+                              processing_time: float, keywords_added: List[str]) -> None:
+    """Queue a history row for the write-behind buffer; never fails the caller"""
     try:
-        pdf_file = io.BytesIO(pdf_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        history_entry = build_history_entry(
+            session_id,
+            resume_text,
+            job_description,
+            processing_time,
+            keywords_added
+        )
+        history_writer.add(history_entry.dict())
+    except Exception as e:
+        # Don't fail the request if history save fails
+        logging.warning(f"Failed to save processing history: {e}")
+
+
+def record_prompt_tokens(compacted: dict) -> None:
+    PROMPT_TOKENS.observe(compacted["prompt_tokens"])
+    PROMPT_TOKENS_SAVED.inc(compacted["tokens_saved"])
+
+
+async def generate_customization(resume_text: str, job_description: str, compacted: dict,
+                                 session_id: str, cache_key: str, timer: StageTimer) -> dict:
+    """Run the LLM customization and store the result in the response cache"""
+    with timer.stage("prompt_build"):
+        # Prepare the prompt from the compacted inputs
+        user_prompt = USER_PROMPT_TEMPLATE.format(
+            resume_text=compacted["resume_text"],
+            job_description=compacted["job_description"]
+        )
         
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
+        user_message = llm_factory.message(user_prompt)
+    
+    # Get AI response
+    with timer.stage("llm"):
+        ai_response = await send_llm_message(session_id, user_message)
+    record_prompt_tokens(compacted)
+    customized_resume = ai_response.strip()
+    
+    # Analyze improvements and keywords
+    with timer.stage("analyze"):
+        improvements, keywords_added, keyword_coverage = analyze_improvements(
+            resume_text, 
+            customized_resume, 
+            job_description
+        )
+    
+    result = {
+        "customized_resume": customized_resume,
+        "improvements": improvements,
+        "keywords_added": keywords_added,
+        "keyword_coverage": keyword_coverage
+    }
+    with timer.stage("cache_store"):
+        await customization_cache.set(cache_key, result)
+    return result
+
+
+async def get_customization(resume_text: str, job_description: str, session_id: str,
+                            timer: Optional[StageTimer] = None) -> dict:
+    """Return a cached customization or generate one, coalescing identical in-flight calls.
+
+    The result also carries ``tokens_saved`` by input compaction for this request.
+    """
+    timer = timer or StageTimer()
+    with timer.stage("compact"):
+        compacted = compact_prompt_inputs(resume_text, job_description, PROMPT_TOKEN_BUDGET)
+    cache_key = customization_cache_key(compacted["resume_text"], compacted["job_description"])
+    
+    with timer.stage("cache_lookup"):
+        result = await customization_cache.get(cache_key)
+    
+    if result is None:
+        if cache_key in customization_flight:
+            # Another request owns the LLM call; time how long we wait on it
+            with timer.stage("coalesced_wait"):
+                result = await customization_flight.do(cache_key, None)
+        else:
+            result = await customization_flight.do(
+                cache_key,
+                lambda: generate_customization(resume_text, job_description, compacted, session_id, cache_key, timer)
+            )
+    
+    return {**result, "tokens_saved": compacted["tokens_saved"]}
+
+
+def parse_rewritten_sections(response: str, count: int) -> Optional[List[str]]:
+    """Split a marker-delimited LLM response into ``count`` sections, or None if it is malformed"""
+    parts = SECTION_MARKER_PATTERN.split(response)
+    sections = {int(index): text.strip() for index, text in zip(parts[1::2], parts[2::2])}
+    if sorted(sections) != list(range(1, count + 1)) or not all(sections.values()):
+        return None
+    return [sections[index] for index in range(1, count + 1)]
+
+
+async def rewrite_sections(sections: List[str], job_description: str, session_id: str) -> Optional[List[str]]:
+    """Optimize several resume sections in one LLM call"""
+    user_message = llm_factory.message(SECTION_PROMPT_TEMPLATE.format(
+        job_description=job_description,
+        sections="\n\n".join(f"### SECTION {index}\n{section}" for index, section in enumerate(sections, 1))
+    ))
+    response = await send_llm_message(session_id, user_message)
+    return parse_rewritten_sections(response, len(sections))
+
+
+async def get_incremental_customization(resume_text: str, job_description: str, session_id: str,
+                                        timer: Optional[StageTimer] = None) -> dict:
+    """Customize section by section, sending only sections without a cached rewrite to the LLM.
+
+    The resume is split into blocks (one per section, one per experience or
+    project entry). Each block's rewrite is cached under a hash of the block
+    and the job description, so resubmitting after editing one bullet only
+    regenerates the entry that contains it. Falls back to a full
+    customization if the model's reply cannot be split back into sections.
+    """
+    timer = timer or StageTimer()
+    with timer.stage("compact"):
+        compacted = compact_prompt_inputs(resume_text, job_description, PROMPT_TOKEN_BUDGET)
+    
+    blocks = split_blocks(compacted["resume_text"])
+    keys = [section_cache_key(block, compacted["job_description"]) for block in blocks]
+    
+    with timer.stage("cache_lookup"):
+        cached = await asyncio.gather(*(section_cache.get(key) for key in keys))
+    rewritten = [entry["text"] if entry is not None else None for entry in cached]
+    stale = [index for index, text in enumerate(rewritten) if text is None]
+    reused_tokens = sum(count_tokens(block) for block, text in zip(blocks, rewritten) if text is not None)
+    
+    if stale:
+        with timer.stage("llm"):
+            fresh = await rewrite_sections([blocks[index] for index in stale], compacted["job_description"], session_id)
         
-        page_count = len(pdf_reader.pages)
-        return text_content.strip(), page_count
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to extract PDF text: {str(e)}")
+        if fresh is None:
+            logging.warning("Section rewrite could not be parsed; regenerating the whole resume")
+            result = await get_customization(resume_text, job_description, session_id, timer)
+            return {**result, "sections_reused": 0, "sections_regenerated": len(blocks)}
+        
+        record_prompt_tokens({
+            "prompt_tokens": sum(count_tokens(blocks[index]) for index in stale) + count_tokens(compacted["job_description"]),
+            "tokens_saved": compacted["tokens_saved"] + reused_tokens
+        })
+        with timer.stage("cache_store"):
+            await asyncio.gather(*(
+                section_cache.set(keys[index], {"text": text}) for index, text in zip(stale, fresh)
+            ))
+        for index, text in zip(stale, fresh):
+            rewritten[index] = text
+    
+    customized_resume = "\n\n".join(rewritten)
+    with timer.stage("analyze"):
+        improvements, keywords_added, keyword_coverage = analyze_improvements(
+            resume_text,
+            customized_resume,
+            job_description
+        )
+    
+    return {
+        "customized_resume": customized_resume,
+        "improvements": improvements,
+        "keywords_added": keywords_added,
+        "keyword_coverage": keyword_coverage,
+        "tokens_saved": compacted["tokens_saved"] + reused_tokens,
+        "sections_reused": len(blocks) - len(stale),
+        "sections_regenerated": len(stale)
+    }
 
 
-def extract_job_title(job_description: str) -> str:
-    """Extract job title from job description"""
-    lines = job_description.strip().split('\n')[:5]  # Check first 5 lines
+async def generate_draft(resume_text: str, job_description: str, compacted: dict,
+                         session_id: str, timer: StageTimer) -> dict:
+    """Quick stand-in for the full rewrite: the draft model if it answers in time, else a local draft"""
+    draft_text = None
+    source = "model"
+    if DRAFT_LLM_MODEL:
+        try:
+            with timer.stage("draft_llm"):
+                # Same provider: while its breaker is open, go straight to the local
+                # draft. allow() leaves the recovery probe to the queued full rewrite.
+                if not llm_breaker.allow():
+                    raise RuntimeError("upstream LLM circuit is open")
+                chat = llm_factory.session(f"{session_id}-draft", model=DRAFT_LLM_MODEL)
+                user_message = llm_factory.message(USER_PROMPT_TEMPLATE.format(
+                    resume_text=compacted["resume_text"],
+                    job_description=compacted["job_description"]
+                ))
+                response = await asyncio.wait_for(
+                    llm_limiter.run(lambda: chat.send_message(user_message)),
+                    DRAFT_TIMEOUT_SECONDS
+                )
+            draft_text = response.strip() or None
+        except Exception as e:
+            logger.warning(f"Draft model unavailable, using the local draft: {e!r}")
     
-    for line in lines:
-        line = line.strip()
-        if len(line) > 5 and len(line) < 100:  # Reasonable job title length
-            # Check if it looks like a job title (not a full sentence)
-            if not line.endswith('.') and not line.startswith('http'):
-                return line
+    if draft_text is None:
+        source = "local"
+        with timer.stage("draft_local"):
+            draft_text = local_draft(
+                document_index.get(resume_text),
+                document_index.get(job_description),
+                KEYWORDS_MAX
+            )
+    draft_counts[source] += 1
     
-    return "Unknown Position"
+    with timer.stage("analyze"):
+        improvements, keywords_added, keyword_coverage = analyze_improvements(resume_text, draft_text, job_description)
+    return {
+        "customized_resume": draft_text,
+        "improvements": improvements,
+        "keywords_added": keywords_added,
+        "keyword_coverage": keyword_coverage,
+        "tokens_saved": compacted["tokens_saved"],
+        "draft_source": source
+    }
 
 
-def analyze_improvements(original_resume: str, customized_resume: str, job_description: str) -> tuple[List[str], List[str]]:
-    """Analyze improvements made and keywords added"""
+async def get_draft_customization(resume_text: str, job_description: str, session_id: str,
+                                  incremental: bool, timer: StageTimer) -> tuple[dict, Optional[str]]:
+    """Return the finished customization if cached, else a draft plus the id of the queued full rewrite.
+
+    The full rewrite runs on the job queue, which records it in the session
+    history once done; poll ``GET /api/jobs/{final_job_id}`` for it.
+    """
+    with timer.stage("compact"):
+        compacted = compact_prompt_inputs(resume_text, job_description, PROMPT_TOKEN_BUDGET)
+    with timer.stage("cache_lookup"):
+        cached = await customization_cache.get(
+            customization_cache_key(compacted["resume_text"], compacted["job_description"])
+        )
+    if cached is not None:
+        draft_counts["final_cached"] += 1
+        return {**cached, "tokens_saved": compacted["tokens_saved"]}, None
     
-    # Mock analysis for now - in a real implementation, you might use NLP to detect changes
-    improvements = [
-        "Enhanced professional summary to align with job requirements",
-        "Restructured experience section to highlight relevant skills",
-        "Added industry-specific keywords for ATS optimization",
-        "Improved action verbs and quantified achievements",
-        "Optimized formatting for ATS compatibility"
-    ]
+    # Queue the full rewrite first so it runs while the draft is produced
+    with timer.stage("enqueue"):
+        final_job_id = await customization_jobs.enqueue({
+            "resume_text": resume_text,
+            "job_description": job_description,
+            "session_id": session_id,
+            "incremental": incremental
+        })
+    return await generate_draft(resume_text, job_description, compacted, session_id, timer), final_job_id
+
+
+async def run_customization_job(payload: dict) -> dict:
+    """Queue worker handler: the /api/customize-resume logic for one queued job"""
+    start_time = time.time()
+    session_id = payload["session_id"]
     
-    # Extract potential keywords from job description
-    job_words = set(re.findall(r'\b[A-Za-z]{3,}\b', job_description.lower()))
-    common_keywords = [
-        'react', 'node.js', 'javascript', 'python', 'aws', 'docker', 
-        'kubernetes', 'api', 'database', 'agile', 'scrum', 'git'
-    ]
+    if payload.get("incremental"):
+        result = await get_incremental_customization(payload["resume_text"], payload["job_description"], session_id)
+    else:
+        result = await get_customization(payload["resume_text"], payload["job_description"], session_id)
     
-    keywords_added = [kw for kw in common_keywords if kw in job_words][:8]
+    processing_time = time.time() - start_time
+    record_processing_history(
+        session_id,
+        payload["resume_text"],
+        payload["job_description"],
+        processing_time,
+        result["keywords_added"]
+    )
+    return {**result, "processing_time": round(processing_time, 2), "session_id": session_id}
+
+
+async def pdf_records(pages: AsyncIterator[str], page_count: int, filename: str,
+                      max_chars: Optional[int]) -> AsyncIterator[str]:
+    """NDJSON records for a streamed extraction: one per page, then a summary.
+
+    Pages are parsed in a PDF pool worker and arrive as it reads them.
+    """
+    pages_extracted = 0
+    char_count = 0
+    try:
+        async for text in pages:
+            pages_extracted += 1
+            char_count += len(text)
+            yield json.dumps({"page": pages_extracted, "text": text}) + "\n"
+    except HTTPException as e:
+        yield json.dumps({"error": e.detail}) + "\n"
+        return
     
-    return improvements, keywords_added
+    truncated = pages_extracted < page_count or (max_chars is not None and char_count >= max_chars)
+    yield json.dumps({
+        "filename": filename,
+        "page_count": page_count,
+        "pages_extracted": pages_extracted,
+        "truncated": truncated
+    }) + "\n"
+
+
+def json_default(value):
+    """json.dumps fallback for Mongo values, matching FastAPI's datetime encoding"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_keyset_cursor(sort_value: datetime, tie_breaker: str) -> str:
+    """Opaque pagination cursor for (timestamp, id) keyset queries"""
+    raw = f"{sort_value.isoformat()}|{tie_breaker}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        sort_value, tie_breaker = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(sort_value), tie_breaker
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 # Add your routes to the router instead of directly to app
@@ -158,118 +804,493 @@ async def root():
     return {"message": "ATS Resume Customization Agent API"}
 
 
+@api_router.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until startup has finished and while MongoDB is unreachable"""
+    if not app_ready:
+        raise HTTPException(status_code=503, detail="Starting up")
+    
+    try:
+        async with mongo_timer("admin", "ping"):
+            await asyncio.wait_for(db.command("ping"), READY_MONGO_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning(f"Readiness check failed to reach MongoDB: {e}")
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    
+    return {"status": "ready"}
+
+
 @api_router.post("/extract-pdf", response_model=PDFExtractionResponse)
-async def extract_pdf(file: UploadFile = File(...)):
+async def extract_pdf(
+    file: UploadFile = File(...),
+    max_pages: Optional[int] = Query(None, ge=1, description="Stop after this many pages"),
+    max_chars: Optional[int] = Query(None, ge=1, description="Stop after this many characters"),
+    stream: bool = Query(False, description="Stream one NDJSON record per page")
+):
     """Extract text from uploaded PDF file"""
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
+    # Spooled to a temp file in chunks (never held in memory whole) and
+    # handed to the parser by path; removed once the response is done
+    spooled_path, size, digest = await pdf_pool.spool(file.file)
     try:
-        content = await file.read()
-        extracted_text, page_count = extract_pdf_text(content)
+        PDF_BYTES.observe(size)
+        
+        if stream:
+            page_count, pages = await pdf_pool.stream(spooled_path, max_pages, max_chars)
+            # The worker has the file mapped, so it can be unlinked once the response ends
+            cleanup = BackgroundTask(os.remove, spooled_path)
+            spooled_path = None
+            return StreamingResponse(
+                pdf_records(pages, page_count, file.filename, max_chars),
+                media_type="application/x-ndjson",
+                background=cleanup
+            )
+        
+        cache_key = f"{digest}:{max_pages}:{max_chars}"
+        cached = await pdf_cache.get(cache_key, saved_bytes=size)
+        if cached is not None:
+            document_index.get(cached["extracted_text"])
+            return PDFExtractionResponse(filename=file.filename, **cached)
+        
+        with PDF_PARSE_SECONDS.time():
+            extracted_text, page_count, truncated = await pdf_pool.extract(spooled_path, max_pages, max_chars)
+        PDF_PAGES.observe(page_count)
         
         if not extracted_text.strip():
             raise HTTPException(status_code=400, detail="No text could be extracted from the PDF")
         
+        await pdf_cache.set(cache_key, {
+            "extracted_text": extracted_text,
+            "page_count": page_count,
+            "truncated": truncated
+        })
+        # Index the text now so scoring and customizing it next skip the parse
+        document_index.get(extracted_text)
+        
         return PDFExtractionResponse(
             extracted_text=extracted_text,
             filename=file.filename,
-            page_count=page_count
+            page_count=page_count,
+            truncated=truncated
         )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process PDF: {str(e)}")
+    finally:
+        if spooled_path is not None:
+            os.remove(spooled_path)
 
 
 @api_router.post("/customize-resume", response_model=ResumeCustomizeResponse)
-async def customize_resume(request: ResumeCustomizeRequest):
+async def customize_resume(request: ResumeCustomizeRequest, response: Response):
     """Customize resume based on job description using OpenAI GPT"""
     start_time = time.time()
     session_id = request.session_id or str(uuid.uuid4())
+    timer = StageTimer()
     
-    if not request.resume_text.strip():
-        raise HTTPException(status_code=400, detail="Resume text cannot be empty")
-    
-    if not request.job_description.strip():
-        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    with timer.stage("validate"):
+        validate_customize_inputs(request.resume_text, request.job_description)
     
     try:
-        # Create OpenAI chat instance
-        chat = create_llm_chat(session_id)
-        
-        # Prepare the prompt
-        user_prompt = f"""RESUME:
-{request.resume_text}
-
-JOB DESCRIPTION:
-{request.job_description}
-
-Please optimize this resume for the above job description. Follow the guidelines provided in the system message and return ONLY the optimized resume text, formatted professionally and ready for ATS scanning."""
-        
-        user_message = UserMessage(text=user_prompt)
+        final_job_id = None
+        if request.draft:
+            result, final_job_id = await get_draft_customization(
+                request.resume_text, request.job_description, session_id, request.incremental, timer
+            )
+        elif request.incremental:
+            result = await get_incremental_customization(request.resume_text, request.job_description, session_id, timer)
+        else:
+            result = await get_customization(request.resume_text, request.job_description, session_id, timer)
         
-        # Get AI response
-        ai_response = await chat.send_message(user_message)
-        customized_resume = ai_response.strip()
-        
-        # Analyze improvements and keywords
-        improvements, keywords_added = analyze_improvements(
-            request.resume_text, 
-            customized_resume, 
-            request.job_description
-        )
+        customized_resume = result["customized_resume"]
+        improvements = result["improvements"]
+        keywords_added = result["keywords_added"]
         
         processing_time = time.time() - start_time
         
-        # Save processing history
-        try:
-            job_title = extract_job_title(request.job_description)
-            history_entry = ProcessingHistory(
-                session_id=session_id,
-                original_resume_preview=request.resume_text[:500],
-                job_title=job_title,
-                processing_time=processing_time,
-                keywords_added=keywords_added
-            )
-            await db.processing_history.insert_one(history_entry.dict())
-        except Exception as e:
-            # Don't fail the request if history save fails
-            logging.warning(f"Failed to save processing history: {e}")
+        # Save processing history (flushed to Mongo in the background); for a
+        # draft, the queued full rewrite records it when it completes
+        if final_job_id is None:
+            with timer.stage("history_write"):
+                record_processing_history(
+                    session_id,
+                    request.resume_text,
+                    request.job_description,
+                    processing_time,
+                    keywords_added
+                )
+        
+        if SERVER_TIMING_ENABLED:
+            response.headers["Server-Timing"] = timer.server_timing()
         
         return ResumeCustomizeResponse(
             customized_resume=customized_resume,
             improvements=improvements,
             keywords_added=keywords_added,
             processing_time=round(processing_time, 2),
-            session_id=session_id
+            session_id=session_id,
+            keyword_coverage=result.get("keyword_coverage"),
+            tokens_saved=result["tokens_saved"],
+            sections_reused=result.get("sections_reused"),
+            sections_regenerated=result.get("sections_regenerated"),
+            draft=final_job_id is not None,
+            draft_source=result.get("draft_source"),
+            final_job_id=final_job_id
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Resume customization failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to customize resume: {str(e)}")
 
 
+@api_router.post("/customize-resume/stream")
+async def customize_resume_stream(request: ResumeCustomizeRequest):
+    """Stream the customized resume as Server-Sent Events while it is generated.
+
+    Emits ``token`` events with text chunks, then a single ``done`` event with
+    improvements, keywords_added, keyword_coverage, tokens_saved,
+    processing_time and session_id (or an ``error`` event). History is saved after the stream closes.
+    """
+    start_time = time.time()
+    session_id = request.session_id or str(uuid.uuid4())
+    
+    validate_customize_inputs(request.resume_text, request.job_description)
+    
+    compacted = compact_prompt_inputs(request.resume_text, request.job_description, PROMPT_TOKEN_BUDGET)
+    cache_key = customization_cache_key(compacted["resume_text"], compacted["job_description"])
+    cached = await customization_cache.get(cache_key)
+    history = {}
+    
+    # Admit before the response starts so overload is still a proper 503. If
+    # the breaker makes this stream its recovery probe, every exit must report
+    # the outcome or give the probe back.
+    probe = False
+    if cached is None:
+        probe = llm_breaker.check()
+        try:
+            await llm_limiter.acquire()
+        except BaseException:
+            if probe:
+                llm_breaker.abandon()
+            raise
+    llm_slot = {"held": cached is None, "start": time.monotonic(), "rate_limited": False}
+    
+    def release_llm_slot():
+        if llm_slot["held"]:
+            llm_slot["held"] = False
+            llm_limiter.release(time.monotonic() - llm_slot["start"], llm_slot["rate_limited"])
+    
+    async def event_stream():
+        try:
+            if cached is not None:
+                customized_resume = cached["customized_resume"]
+                improvements = cached["improvements"]
+                keywords_added = cached["keywords_added"]
+                keyword_coverage = cached.get("keyword_coverage")
+                yield format_sse("token", {"text": customized_resume})
+            else:
+                chat = create_llm_chat(session_id)
+                user_message = llm_factory.message(USER_PROMPT_TEMPLATE.format(
+                    resume_text=compacted["resume_text"],
+                    job_description=compacted["job_description"]
+                ))
+                
+                chunks = []
+                try:
+                    async for chunk in llm_caller.stream(stream_llm_response(chat, user_message), probe):
+                        chunks.append(chunk)
+                        yield format_sse("token", {"text": chunk})
+                except Exception as e:
+                    llm_slot["rate_limited"] = is_rate_limit_error(e)
+                    raise
+                finally:
+                    release_llm_slot()
+                record_prompt_tokens(compacted)
+                
+                customized_resume = "".join(chunks).strip()
+                improvements, keywords_added, keyword_coverage = analyze_improvements(
+                    request.resume_text,
+                    customized_resume,
+                    request.job_description
+                )
+                await customization_cache.set(cache_key, {
+                    "customized_resume": customized_resume,
+                    "improvements": improvements,
+                    "keywords_added": keywords_added,
+                    "keyword_coverage": keyword_coverage
+                })
+            
+            processing_time = time.time() - start_time
+            history.update(processing_time=processing_time, keywords_added=keywords_added)
+            
+            yield format_sse("done", {
+                "improvements": improvements,
+                "keywords_added": keywords_added,
+                "keyword_coverage": keyword_coverage,
+                "tokens_saved": compacted["tokens_saved"],
+                "processing_time": round(processing_time, 2),
+                "session_id": session_id
+            })
+        except Exception as e:
+            logging.error(f"Streaming resume customization failed: {e}")
+            yield format_sse("error", {"detail": f"Failed to customize resume: {str(e)}"})
+    
+    async def save_history_after_stream():
+        # The stream may be abandoned before the generator ever reached the LLM
+        if llm_slot["held"] and probe:
+            llm_breaker.abandon()
+        release_llm_slot()
+        if history:
+            record_processing_history(
+                session_id,
+                request.resume_text,
+                request.job_description,
+                history["processing_time"],
+                history["keywords_added"]
+            )
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(save_history_after_stream)
+    )
+
+
+@api_router.post("/jobs/customize", status_code=202)
+async def enqueue_customization_job(request: ResumeCustomizeRequest):
+    """Queue a resume customization and return its job id right away.
+
+    Poll ``GET /api/jobs/{job_id}`` (optionally with ``wait`` to long-poll)
+    for the status and, once completed, the customization result.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    validate_customize_inputs(request.resume_text, request.job_description)
+    
+    try:
+        job_id = await customization_jobs.enqueue({
+            "resume_text": request.resume_text,
+            "job_description": request.job_description,
+            "session_id": session_id,
+            "incremental": request.incremental
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue customization: {str(e)}")
+    
+    return {"job_id": job_id, "status": "queued", "session_id": session_id}
+
+
+@api_router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_customization_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=JOB_MAX_WAIT_SECONDS, description="Seconds to wait for the job to finish")
+):
+    """Status of a queued customization, with its result once completed"""
+    if wait:
+        job = await customization_jobs.wait(job_id, wait)
+    else:
+        job = await customization_jobs.get(job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobStatusResponse(
+        job_id=job["_id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        result=job.get("result"),
+        error=job.get("error")
+    )
+
+
+@api_router.post("/customize-resume/batch")
+async def customize_resume_batch(request: ResumeBatchCustomizeRequest):
+    """Customize one resume against many job descriptions.
+
+    Job descriptions are processed concurrently (bounded by ``concurrency``)
+    and results are streamed as NDJSON lines in completion order, each tagged
+    with its ``index`` in the request. A final summary line closes the stream.
+    The batch's history rows go to the write-behind buffer in one ``add_many``
+    when the stream ends, and the buffer stores them with batched
+    ``insert_many`` calls.
+    """
+    start_time = time.time()
+    session_id = request.session_id or str(uuid.uuid4())
+    
+    if not request.resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+    
+    if not request.job_descriptions:
+        raise HTTPException(status_code=400, detail="At least one job description is required")
+    
+    if len(request.job_descriptions) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_JOBS} job descriptions are allowed per batch")
+    
+    for index, job_description in enumerate(request.job_descriptions):
+        if not job_description.strip():
+            raise HTTPException(status_code=400, detail=f"Job description {index} cannot be empty")
+    
+    concurrency = max(1, min(request.concurrency or BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    semaphore = asyncio.Semaphore(concurrency)
+    history_entries = []
+    
+    async def customize_one(index: int, job_description: str) -> dict:
+        async with semaphore:
+            item_start = time.time()
+            try:
+                result = await get_customization(request.resume_text, job_description, session_id)
+                processing_time = time.time() - item_start
+                history_entry = build_history_entry(
+                    session_id,
+                    request.resume_text,
+                    job_description,
+                    processing_time,
+                    result["keywords_added"]
+                )
+                history_entries.append(history_entry.dict())
+                
+                return {
+                    "index": index,
+                    "job_title": history_entry.job_title,
+                    "customized_resume": result["customized_resume"],
+                    "improvements": result["improvements"],
+                    "keywords_added": result["keywords_added"],
+                    "keyword_coverage": result.get("keyword_coverage"),
+                    "tokens_saved": result["tokens_saved"],
+                    "processing_time": round(processing_time, 2)
+                }
+            except Exception as e:
+                logging.error(f"Batch resume customization failed for job {index}: {e}")
+                return {"index": index, "error": f"Failed to customize resume: {str(e)}"}
+    
+    async def result_stream():
+        tasks = [
+            asyncio.ensure_future(customize_one(index, job_description))
+            for index, job_description in enumerate(request.job_descriptions)
+        ]
+        failed = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                item = await next_result
+                failed += "error" in item
+                yield json.dumps(item) + "\n"
+        finally:
+            # Stop outstanding work if the client goes away mid-stream
+            for task in tasks:
+                task.cancel()
+            history_writer.add_many(history_entries)
+        
+        yield json.dumps({
+            "session_id": session_id,
+            "completed": len(tasks) - failed,
+            "failed": failed,
+            "processing_time": round(time.time() - start_time, 2)
+        }) + "\n"
+    
+    return StreamingResponse(
+        result_stream(),
+        media_type="application/x-ndjson"
+    )
+
+
+@api_router.post("/score")
+async def score_resume_match(request: ResumeScoreRequest):
+    """Score a resume against one or more job descriptions locally, without the LLM.
+
+    Pass ``job_description`` and/or ``job_descriptions``; results keep that
+    order and each carries its ``index``, ``job_title``, ``match_score``
+    (0-100), matched and missing keywords and per-section coverage.
+    """
+    start_time = time.time()
+    
+    job_descriptions = list(request.job_descriptions or [])
+    if request.job_description is not None:
+        job_descriptions.insert(0, request.job_description)
+    
+    if not request.resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+    
+    if not job_descriptions:
+        raise HTTPException(status_code=400, detail="At least one job description is required")
+    
+    if len(job_descriptions) > SCORE_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {SCORE_MAX_JOBS} job descriptions can be scored at once")
+    
+    for index, job_description in enumerate(job_descriptions):
+        if not job_description.strip():
+            raise HTTPException(status_code=400, detail=f"Job description {index} cannot be empty")
+    
+    scores = score_resume(
+        document_index.get(request.resume_text),
+        [document_index.get(job_description) for job_description in job_descriptions],
+        limit=KEYWORDS_MAX
+    )
+    for result in scores["results"]:
+        result["job_title"] = extract_job_title(job_descriptions[result["index"]])
+    
+    scores["processing_time"] = round(time.time() - start_time, 4)
+    return scores
+
+
 @api_router.get("/history/{session_id}")
-async def get_processing_history(session_id: str):
-    """Get processing history for a session"""
+async def get_processing_history(
+    session_id: str,
+    limit: int = Query(10, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Get processing history for a session, newest first, one keyset page at a time"""
+    query = {"session_id": session_id}
+    if cursor is not None:
+        created_at, last_id = decode_keyset_cursor(cursor)
+        try:
+            last_id = ObjectId(last_id)
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+    
     try:
-        history = await db.processing_history.find(
-            {"session_id": session_id}
-        ).sort("created_at", -1).limit(10).to_list(10)
+        async def fetch_page():
+            async with mongo_timer("processing_history", "find"):
+                return await db.processing_history.find(
+                    query, HISTORY_PROJECTION
+                ).sort(HISTORY_SORT).limit(limit + 1).to_list(limit + 1)
+        
+        async def count_all():
+            # Served from the (session_id, created_at, _id) index
+            async with mongo_timer("processing_history", "count_documents"):
+                return await db.processing_history.count_documents({"session_id": session_id})
+        
+        async def fetch_latest():
+            async with mongo_timer("processing_history", "find_one"):
+                return await db.processing_history.find_one(
+                    {"session_id": session_id}, {"created_at": 1}, sort=HISTORY_SORT
+                )
+        
+        if cursor is None:
+            history, processing_count = await asyncio.gather(fetch_page(), count_all())
+            latest = history[0] if history else None
+        else:
+            history, processing_count, latest = await asyncio.gather(fetch_page(), count_all(), fetch_latest())
         
-        if not history:
-            return {
-                "session_id": session_id,
-                "processing_count": 0,
-                "last_processed": None,
-                "recent_customizations": []
-            }
+        next_cursor = None
+        if len(history) > limit:
+            history = history[:limit]
+            next_cursor = encode_keyset_cursor(history[-1]["created_at"], str(history[-1]["_id"]))
         
         return {
             "session_id": session_id,
-            "processing_count": len(history),
-            "last_processed": history[0]["created_at"],
+            "processing_count": processing_count,
+            "last_processed": latest["created_at"] if latest else None,
             "recent_customizations": [
                 {
                     "job_title": item["job_title"],
@@ -278,35 +1299,138 @@ async def get_processing_history(session_id: str):
                     "created_at": item["created_at"]
                 }
                 for item in history
-            ]
+            ],
+            "next_cursor": next_cursor
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve history: {str(e)}")
 
 
+@api_router.get("/admin/cache")
+async def get_cache_stats():
+    """Report hit/miss counters for the response caches and request coalescing"""
+    return {
+        "customization": customization_cache.stats(),
+        "customization_single_flight": customization_flight.stats(),
+        "section": section_cache.stats(),
+        "pdf": pdf_cache.stats(),
+        "documents": document_index.stats()
+    }
+
+
+@api_router.get("/admin/llm")
+async def get_llm_stats():
+    """Report upstream LLM client state and admission-control limits"""
+    return {
+        "client": llm_factory.stats(),
+        "limiter": llm_limiter.stats(),
+        "rate_limit": llm_rate_limiter.stats(),
+        "resilience": llm_caller.stats(),
+        "drafts": dict(draft_counts)
+    }
+
+
+@api_router.get("/admin/jobs")
+async def get_job_queue_stats():
+    """Report worker occupancy and outcome counters for the customization job queue"""
+    return customization_jobs.stats()
+
+
+@api_router.get("/admin/pdf")
+async def get_pdf_pool_stats():
+    """Report queue depth and outcome counters for the PDF extraction pool"""
+    return pdf_pool.stats()
+
+
 # Legacy endpoints for backward compatibility
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    async with mongo_timer("status_checks", "insert_one"):
+        _ = await db.status_checks.insert_one(status_obj.dict())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    limit: int = Query(STATUS_MAX_PAGE_SIZE, ge=1, le=STATUS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page")
+):
+    """List status checks oldest first; the next page's cursor is in X-Next-Cursor"""
+    query = {}
+    if cursor is not None:
+        timestamp, last_id = decode_keyset_cursor(cursor)
+        query["$or"] = [
+            {"timestamp": {"$gt": timestamp}},
+            {"timestamp": timestamp, "id": {"$gt": last_id}}
+        ]
+    
+    async with mongo_timer("status_checks", "find"):
+        status_checks = await db.status_checks.find(
+            query, STATUS_PROJECTION
+        ).sort(STATUS_SORT).limit(limit + 1).to_list(limit + 1)
+    
+    headers = {}
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        headers["X-Next-Cursor"] = encode_keyset_cursor(status_checks[-1]["timestamp"], status_checks[-1]["id"])
+    
+    # Documents are stored in StatusCheck shape, so skip the per-row model round trip
+    return Response(
+        content=json.dumps(status_checks, default=json_default),
+        media_type="application/json",
+        headers=headers
+    )
+
+@api_router.get("/status/stream")
+async def stream_status_checks(batch_size: int = Query(500, ge=1, le=5000)):
+    """Stream every status check as NDJSON, serialized as the cursor yields it"""
+    async def status_lines():
+        status_cursor = db.status_checks.find({}, STATUS_PROJECTION).sort(STATUS_SORT).batch_size(batch_size)
+        async for status_check in status_cursor:
+            yield json.dumps(status_check, default=json_default) + "\n"
+    
+    return StreamingResponse(status_lines(), media_type="application/x-ndjson")
 
 
 # Include the router in the main app
 app.include_router(api_router)
 
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus exposition of latency histograms and subsystem gauges"""
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+stats_collector.register("customization_cache", customization_cache.stats)
+stats_collector.register("customization_single_flight", customization_flight.stats)
+stats_collector.register("section_cache", section_cache.stats)
+stats_collector.register("pdf_cache", pdf_cache.stats)
+stats_collector.register("document_index", document_index.stats)
+stats_collector.register("pdf_pool", pdf_pool.stats)
+stats_collector.register("llm_client", llm_factory.stats)
+stats_collector.register("llm_limiter", llm_limiter.stats)
+stats_collector.register("llm_rate_limit", llm_rate_limiter.stats)
+stats_collector.register("llm_resilience", llm_caller.stats)
+stats_collector.register("llm_breaker", llm_breaker.stats)
+stats_collector.register("customization_drafts", lambda: draft_counts)
+stats_collector.register("history_writer", history_writer.stats)
+stats_collector.register("customization_jobs", customization_jobs.stats)
+
+app.add_middleware(
+    UploadSignatureMiddleware,
+    signatures={"/api/extract-pdf": (PDF_MAGIC, "File is not a PDF")},
+    window=PDF_MAGIC_WINDOW
+)
+app.add_middleware(BodySizeLimitMiddleware, limits={"/api/extract-pdf": UPLOAD_MAX_BYTES})
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
 # Configure logging
@@ -316,6 +1440,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def startup():
+    global client, db, app_ready
+    client = create_mongo_client()
+    db = client[os.environ['DB_NAME']]
+
+    # Build the keyword automaton before the first request needs it
+    lexicon = load_lexicon()
+    logger.info(f"Loaded skills lexicon with {len(lexicon)} terms")
+
+    await customization_cache.start(db.customization_cache)
+    await section_cache.start(db.customization_section_cache)
+    await pdf_cache.start(db.pdf_extraction_cache)
+    await create_indexes()
+    await llm_rate_limiter.start(db.rate_limits)
+    history_writer.start(db.processing_history)
+    llm_factory.start()
+    pdf_pool.start()
+    await customization_jobs.start(db.customization_jobs, run_customization_job)
+
+    if LLM_PRELOAD:
+        llm_preload.append(asyncio.ensure_future(preload_llm()))
+    app_ready = True
+
+
+async def preload_llm():
+    """Import the LLM stack off the event loop so the first customization does not pay for it"""
+    try:
+        await asyncio.to_thread(llm_factory.load)
+    except Exception as e:
+        # The first LLM call retries the import and reports the error to its caller
+        logger.warning(f"Failed to preload the LLM client: {e}")
+
+
+async def create_indexes():
+    try:
+        await db.processing_history.create_index(
+            [("session_id", 1), ("created_at", -1), ("_id", -1)],
+            name="session_recent"
+        )
+    except Exception as e:
+        logger.warning(f"Failed to create processing_history index: {e}")
+    
+    try:
+        await db.status_checks.create_index([("timestamp", 1), ("id", 1)], name="status_order")
+    except Exception as e:
+        logger.warning(f"Failed to create status_checks index: {e}")
+
+
+async def shutdown():
+    global app_ready
+    app_ready = False
+    for task in llm_preload:
+        task.cancel()
+    llm_preload.clear()
+    # Running jobs are handed back to the queue for the next worker
+    await customization_jobs.stop()
+    pdf_pool.stop()
+    await llm_factory.stop()
+    # Drain buffered history rows before the connection goes away
+    await history_writer.stop()
+    client.close()
@@ -0,0 +1,104 @@
+"""Write-behind buffering of MongoDB inserts off the request path"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from metrics import mongo_timer
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Collects documents in memory and writes them in batches with insert_many.
+
+    A background task flushes when ``max_batch`` documents are pending or every
+    ``flush_interval`` seconds, whichever comes first. Memory is bounded by
+    ``max_pending``: documents arriving while the buffer is full are dropped
+    and counted, as are batches whose insert fails.
+    """
+
+    def __init__(self, name: str, max_batch: int, flush_interval: float, max_pending: int):
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.collection = None
+        self.flushes = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.flush_failures = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, collection) -> None:
+        self.collection = collection
+        self._closing = False
+        # Bound to the running loop on first use, so a restart gets a fresh one
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task after draining everything still pending"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    def add(self, document: Dict[str, Any]) -> bool:
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+
+        self._pending.append(document)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    def add_many(self, documents: List[Dict[str, Any]]) -> int:
+        """Queue several documents at once; returns how many were accepted"""
+        accepted = documents[:max(0, self.max_pending - len(self._pending))]
+        self.dropped += len(documents) - len(accepted)
+        self._pending.extend(accepted)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return len(accepted)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def flush(self) -> None:
+        while self._pending and self.collection is not None:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+
+            try:
+                async with mongo_timer(self.collection.name, "insert_many"):
+                    await self.collection.insert_many(batch, ordered=False)
+                self.flushes += 1
+                self.flushed += len(batch)
+            except Exception as e:
+                self.flush_failures += 1
+                self.dropped += len(batch)
+                logger.warning(f"Failed to flush {len(batch)} {self.name} documents: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "flush_failures": self.flush_failures,
+        }
@@ -65,6 +65,25 @@ class ATSResumeTestSuite:
             self.log_test("API Health Check", False, f"Exception: {str(e)}")
             return False
     
+    def test_readiness(self):
+        """Test GET /api/ready endpoint"""
+        print("🔍 Testing Readiness Probe...")
+        try:
+            start_time = time.time()
+            response = requests.get(f"{API_BASE_URL}/ready", timeout=10)
+            response_time = time.time() - start_time
+            
+            if response.status_code == 200 and response.json().get("status") == "ready":
+                self.log_test("Readiness Probe", True, f"Response: {response.json()}", response_time)
+                return True
+            else:
+                self.log_test("Readiness Probe", False, f"Status: {response.status_code}, Response: {response.text}", response_time)
+                return False
+                
+        except Exception as e:
+            self.log_test("Readiness Probe", False, f"Exception: {str(e)}")
+            return False
+    
     def test_pdf_extraction_invalid_file(self):
         """Test PDF extraction with invalid file type"""
         print("🔍 Testing PDF Extraction - Invalid File Type...")
@@ -289,6 +308,107 @@ PREFERRED QUALIFICATIONS:
         
         return all_passed
     
+    def test_resume_customization_stream(self):
+        """Test streaming resume customization over Server-Sent Events"""
+        print("🔍 Testing Resume Customization - SSE Stream...")
+        
+        payload = {
+            "resume_text": "Jane Doe\nSoftware Engineer\nBuilt REST APIs in Python and deployed them on AWS.",
+            "job_description": "Backend Engineer\nWe need Python, AWS, Docker and Kubernetes experience."
+        }
+        
+        try:
+            start_time = time.time()
+            response = requests.post(
+                f"{API_BASE_URL}/customize-resume/stream",
+                json=payload,
+                headers={'Accept': 'text/event-stream'},
+                stream=True,
+                timeout=45
+            )
+            
+            if response.status_code != 200:
+                self.log_test("Resume Customization - SSE Stream", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+            
+            events = []
+            first_token_time = None
+            event_name = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event_name = line[len("event: "):]
+                elif line.startswith("data: "):
+                    if event_name == "token" and first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    events.append((event_name, json.loads(line[len("data: "):])))
+            response_time = time.time() - start_time
+            
+            token_events = [data for name, data in events if name == "token"]
+            done_events = [data for name, data in events if name == "done"]
+            
+            if not token_events or len(done_events) != 1:
+                self.log_test("Resume Customization - SSE Stream", False, f"Unexpected events: {[name for name, _ in events]}", response_time)
+                return False
+            
+            required_fields = ['improvements', 'keywords_added', 'processing_time', 'session_id']
+            missing_fields = [field for field in required_fields if field not in done_events[0]]
+            if missing_fields:
+                self.log_test("Resume Customization - SSE Stream", False, f"Missing fields in done event: {missing_fields}", response_time)
+                return False
+            
+            streamed_text = "".join(data["text"] for data in token_events)
+            details = f"Received {len(token_events)} token events ({len(streamed_text)} chars), "
+            details += f"first token after {first_token_time:.2f}s"
+            self.log_test("Resume Customization - SSE Stream", True, details, response_time)
+            return True
+            
+        except Exception as e:
+            self.log_test("Resume Customization - SSE Stream", False, f"Exception: {str(e)}")
+            return False
+    
+    def test_resume_score(self):
+        """Test local match scoring against a batch of job descriptions"""
+        print("🔍 Testing Resume Match Score...")
+        
+        payload = {
+            "resume_text": "Jane Doe\nSkills\nPython, Django, PostgreSQL, AWS\nExperience\nBuilt REST APIs in Python.",
+            "job_descriptions": [
+                "Backend Engineer\nWe need Python, Django, PostgreSQL and Kubernetes experience.",
+                "Frontend Developer\nReact, TypeScript and CSS required."
+            ]
+        }
+        
+        try:
+            start_time = time.time()
+            response = requests.post(f"{API_BASE_URL}/score", json=payload, timeout=10)
+            response_time = time.time() - start_time
+            
+            if response.status_code != 200:
+                self.log_test("Resume Match Score", False, f"Status: {response.status_code}, Response: {response.text}", response_time)
+                return False
+            
+            results = response.json().get("results", [])
+            if len(results) != 2:
+                self.log_test("Resume Match Score", False, f"Expected 2 results, got {len(results)}", response_time)
+                return False
+            
+            backend, frontend = results
+            if backend["match_score"] <= frontend["match_score"]:
+                self.log_test("Resume Match Score", False, f"Backend posting should score higher: {backend['match_score']} vs {frontend['match_score']}", response_time)
+                return False
+            
+            if "kubernetes" not in backend["missing_keywords"]:
+                self.log_test("Resume Match Score", False, f"Expected kubernetes in missing keywords: {backend['missing_keywords']}", response_time)
+                return False
+            
+            details = f"Scores: {backend['match_score']} vs {frontend['match_score']}, missing: {backend['missing_keywords']}"
+            self.log_test("Resume Match Score", True, details, response_time)
+            return True
+            
+        except Exception as e:
+            self.log_test("Resume Match Score", False, f"Exception: {str(e)}")
+            return False
+    
     def test_processing_history(self):
         """Test processing history endpoint"""
         print("🔍 Testing Processing History...")
@@ -359,10 +479,13 @@ PREFERRED QUALIFICATIONS:
         # Test sequence
         tests = [
             self.test_health_check,
+            self.test_readiness,
             self.test_pdf_extraction_invalid_file,
             self.test_pdf_extraction_valid_file,
             self.test_resume_customization_validation,
             self.test_resume_customization_core,
+            self.test_resume_customization_stream,
+            self.test_resume_score,
             self.test_processing_history,
             self.test_processing_history_nonexistent
         ]
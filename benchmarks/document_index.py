@@ -0,0 +1,89 @@
+"""Per-request CPU of scoring and keyword analysis as resumes grow, with and without the document index.
+
+Scores one resume against a set of job descriptions, and runs the keyword
+gap analysis for one customized version, at increasing resume sizes:
+"cold" parses every document on each request, "indexed" reads them from a
+warm DocumentIndex as repeated requests for the same texts do. Prints
+milliseconds per request as JSON:
+
+    python -m benchmarks.document_index --sizes 1 4 16 --jobs 20
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict
+
+from benchmarks._common import percentiles
+from benchmarks.pdf_fixtures import JOB_DESCRIPTION, resume_text
+from documents import DocumentIndex, parse_document
+from keywords import keyword_gap, load_lexicon
+from scoring import score_resume
+
+
+def time_ms(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+
+def main(args) -> dict:
+    lexicon = load_lexicon()
+    size = len(lexicon)
+    job_descriptions = [f"{JOB_DESCRIPTION}\nPosting {number}" for number in range(args.jobs)]
+    results = []
+
+    for multiple in args.sizes:
+        resume = "\n\n".join(resume_text(variant) for variant in range(multiple))
+        customized = resume + "\nSkills: FastAPI, MongoDB, Kubernetes"
+        index = DocumentIndex(max_entries=args.jobs + 1, ttl_seconds=3600)
+        index.get(resume)
+        for job_description in job_descriptions:
+            index.get(job_description)
+
+        def score_cold():
+            score_resume(parse_document(resume), [parse_document(jd) for jd in job_descriptions])
+
+        def score_indexed():
+            score_resume(index.get(resume), [index.get(jd) for jd in job_descriptions])
+
+        def gap_cold():
+            keyword_gap(lexicon.term_counts(resume), lexicon.term_counts(customized),
+                        lexicon.term_counts(job_descriptions[0]))
+
+        def gap_indexed():
+            keyword_gap(index.get(resume).skill_vector(size), lexicon.term_counts(customized),
+                        index.get(job_descriptions[0]).skill_vector(size))
+
+        results.append({
+            "resume_chars": len(resume),
+            "score_cold_ms": time_ms(score_cold, args.repeat),
+            "score_indexed_ms": time_ms(score_indexed, args.repeat),
+            "keyword_gap_cold_ms": time_ms(gap_cold, args.repeat),
+            "keyword_gap_indexed_ms": time_ms(gap_indexed, args.repeat),
+            "resume_document_bytes": index.get(resume).nbytes,
+        })
+
+    return {
+        "benchmark": "document_index",
+        "config": {"jobs": args.jobs, "repeat": args.repeat},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16, 64],
+                        help="Resume sizes as multiples of the sample resume")
+    parser.add_argument("--jobs", type=int, default=20, help="Job descriptions scored per request")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = main(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,129 @@
+"""In-process stand-in for emergentintegrations' LlmChat"""
+import asyncio
+import random
+import re
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Union
+
+
+@dataclass
+class FakeUserMessage:
+    text: str
+
+
+class FakeUpstreamError(Exception):
+    """What a failing provider call raises, with its HTTP status"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+
+
+class FakeLlmChat:
+    """Answers like LlmChat without a network call.
+
+    Waits ``latency`` seconds before the first token, then produces
+    ``completion_tokens`` words at ``tokens_per_second``. The completion
+    echoes the prompt's resume plus the job description's first words, so
+    keyword analysis downstream sees realistic input. Settings are class
+    attributes shared by every instance; change them with ``configure``.
+
+    Faults are injected per call, drawn from a generator seeded with
+    ``seed``: ``error_rate`` of calls fail with a 503 and
+    ``rate_limit_rate`` with a 429 before the first token, ``stall_rate``
+    hang for ``stall_seconds`` before answering, and ``slow_rate`` start
+    after ``slow_latency`` instead of ``latency`` (a latency tail). Calls
+    take their fault from ``fault_script`` first while it is not empty:
+    503, 429, "stall", "slow" or None for a normal answer.
+    """
+
+    latency = 1.0
+    tokens_per_second = 80.0
+    completion_tokens = 400
+    # Tokens released per sleep while streaming
+    chunk_tokens = 8
+    error_rate = 0.0
+    rate_limit_rate = 0.0
+    stall_rate = 0.0
+    stall_seconds = 3600.0
+    slow_rate = 0.0
+    slow_latency = 5.0
+    seed = 0
+    fault_script: List[Optional[Union[int, str]]] = []
+    calls = 0
+    faults = 0
+    _random = random.Random(0)
+
+    def __init__(self, api_key=None, session_id=None, system_message=None):
+        self.session_id = session_id
+        self.system_message = system_message
+
+    @classmethod
+    def configure(cls, **settings) -> None:
+        for name, value in settings.items():
+            if not hasattr(cls, name):
+                raise AttributeError(f"Unknown FakeLlmChat setting: {name}")
+            setattr(cls, name, value)
+        cls._random = random.Random(cls.seed)
+
+    def with_model(self, provider: str, model: str) -> "FakeLlmChat":
+        self.provider = provider
+        self.model = model
+        return self
+
+    def completion(self, prompt: str) -> str:
+        resume = prompt.split("JOB DESCRIPTION:", 1)[0].replace("RESUME:", "").strip()
+        job_description = prompt.split("JOB DESCRIPTION:", 1)[-1]
+        words = ("OPTIMIZED RESUME " + resume + " Skills: " + " ".join(re.findall(r"\S+", job_description)[:60])).split()
+        while len(words) < self.completion_tokens:
+            words += words[:self.completion_tokens - len(words)]
+        return " ".join(words[:self.completion_tokens])
+
+    def draw_fault(self) -> Optional[Union[int, str]]:
+        cls = type(self)
+        if cls.fault_script:
+            return cls.fault_script.pop(0)
+        draw = cls._random.random()
+        for rate, fault in ((self.error_rate, 503), (self.rate_limit_rate, 429),
+                            (self.stall_rate, "stall"), (self.slow_rate, "slow")):
+            if draw < rate:
+                return fault
+            draw -= rate
+        return None
+
+    async def first_token_delay(self) -> float:
+        """Time before the first token for this call, raising injected errors"""
+        fault = self.draw_fault()
+        if fault is None:
+            return self.latency
+        type(self).faults += 1
+        if fault == "stall":
+            return self.stall_seconds
+        if fault == "slow":
+            return self.slow_latency
+        await asyncio.sleep(self.latency / 10)
+        raise FakeUpstreamError(fault, "Rate limit reached" if fault == 429 else "Service unavailable")
+
+    async def stream_message(self, user_message) -> AsyncIterator[str]:
+        type(self).calls += 1
+        await asyncio.sleep(await self.first_token_delay())
+
+        words = self.completion(user_message.text).split(" ")
+        for start in range(0, len(words), self.chunk_tokens):
+            chunk = words[start:start + self.chunk_tokens]
+            if self.tokens_per_second:
+                await asyncio.sleep(len(chunk) / self.tokens_per_second)
+            yield (" " if start else "") + " ".join(chunk)
+
+    async def send_message(self, user_message) -> str:
+        return "".join([chunk async for chunk in self.stream_message(user_message)])
+
+
+def install_fake_llm(**settings) -> type:
+    """Make LlmClientFactory hand out FakeLlmChat sessions"""
+    import llm_clients
+
+    FakeLlmChat.configure(**settings)
+    llm_clients.LlmChat = FakeLlmChat
+    llm_clients.UserMessage = FakeUserMessage
+    return FakeLlmChat
@@ -0,0 +1,130 @@
+"""Per-request LLM client overhead: per-request construction vs the pooled factory.
+
+Each iteration sends one prompt with ``LlmChat.send_message`` to a local
+OpenAI-compatible stub server (litellm's ``api_base`` points at it), so the
+whole emergentintegrations -> litellm -> HTTP path is measured:
+
+* ``per_request``: the old path. The environment is read, an LlmChat is
+  constructed, and litellm has no shared session, so it manages its own
+  HTTP clients.
+* ``pooled``: LlmClientFactory.session(), after ``load()`` has installed
+  the factory's keep-alive client as ``litellm.aclient_session``.
+
+The stub counts accepted TCP connections. The factory's client counts the
+requests it sends, so ``requests_via_pooled_client`` shows whether litellm
+actually uses the shared session. Results are printed as JSON:
+
+    python -m benchmarks.llm_client_overhead --requests 500 --concurrency 10
+
+Needs emergentintegrations (which brings litellm) installed next to the
+backend requirements.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import litellm
+
+from benchmarks._common import percentiles
+from benchmarks.stub_llm_server import StubLLMServer
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+from llm_clients import LlmClientFactory
+
+
+SYSTEM_MESSAGE = "You are an expert ATS resume optimization specialist."
+PROMPT = "RESUME: ... JOB DESCRIPTION: ..."
+API_KEY = "sk-benchmark"
+
+
+async def per_request_call(session_id: str) -> None:
+    api_key = os.environ.get('EMERGENT_LLM_KEY', API_KEY)
+    chat = LlmChat(api_key=api_key, session_id=session_id, system_message=SYSTEM_MESSAGE).with_model("openai", "gpt-4o")
+    await chat.send_message(UserMessage(text=PROMPT))
+
+
+async def pooled_call(factory: LlmClientFactory, session_id: str) -> None:
+    await factory.session(session_id).send_message(factory.message(PROMPT))
+
+
+async def run(mode: str, args) -> dict:
+    stub = StubLLMServer(latency=args.latency)
+    await stub.start()
+    # litellm's OpenAI provider sends requests to litellm.api_base when it is set
+    litellm.api_base = stub.url.rsplit("/chat/completions", 1)[0]
+
+    factory = None
+    pooled_requests = 0
+    if mode == "pooled":
+        factory = LlmClientFactory(
+            api_key=API_KEY,
+            system_message=SYSTEM_MESSAGE,
+            provider="openai",
+            model="gpt-4o",
+            max_connections=args.concurrency
+        )
+        factory.start()
+        factory.load()
+
+        async def count_request(request) -> None:
+            nonlocal pooled_requests
+            pooled_requests += 1
+
+        factory.http_client.event_hooks["request"].append(count_request)
+    else:
+        litellm.aclient_session = None
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    durations_ms = []
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            if factory is None:
+                await per_request_call(f"bench-{index}")
+            else:
+                await pooled_call(factory, f"bench-{index}")
+            durations_ms.append((time.perf_counter() - start) * 1000)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*[one(index) for index in range(args.requests)])
+        wall_time = time.perf_counter() - start
+    finally:
+        if factory is not None:
+            await factory.stop()
+        await stub.stop()
+
+    return {
+        "mode": mode,
+        "requests": args.requests,
+        "stub_requests": stub.requests,
+        "tcp_connections": stub.connections,
+        "requests_via_pooled_client": pooled_requests,
+        "rps": round(args.requests / wall_time, 1),
+        "latency_ms": percentiles(durations_ms),
+        # Stub latency is fixed, so anything above it is client-side overhead
+        "mean_overhead_ms": round(sum(durations_ms) / len(durations_ms) - args.latency * 1000, 3),
+    }
+
+
+async def main(args) -> dict:
+    results = [await run("per_request", args), await run("pooled", args)]
+    pooled = results[1]
+    return {
+        "benchmark": "llm_client_overhead",
+        "concurrency": args.concurrency,
+        "stub_latency_s": args.latency,
+        # True when every pooled request reached the stub through the factory's client
+        "pooled_client_used": pooled["requests_via_pooled_client"] == pooled["stub_requests"] > 0,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub response delay in seconds")
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
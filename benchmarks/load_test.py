@@ -0,0 +1,196 @@
+"""Throughput and tail latency of the API, in-process with a fake LLM and MongoDB.
+
+Runs the FastAPI app through httpx's ASGI transport with FakeLlmChat in place
+of the upstream model and mongomock_motor in place of MongoDB, drives each
+scenario at a fixed concurrency and prints RPS, latency percentiles, status
+codes and event-loop lag as JSON, so runs can be diffed for regressions:
+
+    python -m benchmarks.load_test --requests 500 --concurrency 50 --llm-latency 0.5
+
+Scenarios: customize (/api/customize-resume), extract-pdf (/api/extract-pdf)
+and history (/api/history/{session_id}). mongomock executes queries
+synchronously on the event loop, so Mongo-heavy numbers are comparable
+between runs but not with a real server. Needs the backend requirements
+plus benchmarks/requirements.txt.
+
+The fake LLM can inject upstream faults to exercise the LLM call wrapper
+(deadlines, retries, hedging, circuit breaker), whose settings can be
+overridden too, e.g. 10% 503s, 2% stalls and a slow tail with hedging:
+
+    python -m benchmarks.load_test --scenarios customize --llm-error-rate 0.1 \
+        --llm-stall-rate 0.02 --llm-slow-rate 0.05 --llm-attempt-timeout 5 --llm-hedge-percentile 95
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks._common import LoopLagMonitor, percentiles
+from benchmarks.fake_llm import install_fake_llm
+from benchmarks.pdf_fixtures import JOB_DESCRIPTION, build_pdf, resume_text
+
+# server.py reads these at import time; the client is swapped for mongomock below
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+import server  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+
+SCENARIOS = ("customize", "extract-pdf", "history")
+
+
+def configure_app(args) -> None:
+    install_fake_llm(
+        latency=args.llm_latency,
+        tokens_per_second=args.llm_tokens_per_second,
+        completion_tokens=args.llm_completion_tokens,
+        error_rate=args.llm_error_rate,
+        rate_limit_rate=args.llm_rate_limit_rate,
+        stall_rate=args.llm_stall_rate,
+        slow_rate=args.llm_slow_rate,
+        slow_latency=args.llm_slow_latency
+    )
+    # The lifespan handler opens its client through this hook
+    server.create_mongo_client = AsyncMongoMockClient
+    server.llm_factory.api_key = server.llm_factory.api_key or "sk-benchmark"
+    if args.llm_limit:
+        server.llm_limiter.limit = float(args.llm_limit)
+        server.llm_limiter.max_limit = max(server.llm_limiter.max_limit, args.llm_limit)
+    for setting in ("attempt_timeout", "deadline_seconds", "max_retries", "backoff_seconds", "hedge_percentile"):
+        value = getattr(args, f"llm_{setting}")
+        if value is not None:
+            setattr(server.llm_caller, setting, value)
+    if args.llm_breaker_failures is not None:
+        server.llm_breaker.failure_threshold = args.llm_breaker_failures
+
+
+async def drive(name: str, send: Callable[[int], Awaitable[httpx.Response]], args) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    durations_ms = []
+    status_codes = Counter()
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await send(index)
+                status_codes[str(response.status_code)] += 1
+            except Exception as e:
+                status_codes[type(e).__name__] += 1
+            durations_ms.append((time.perf_counter() - start) * 1000)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    # Let the monitor collect a baseline before the load starts
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(index) for index in range(args.requests)])
+    wall_time = time.perf_counter() - start
+
+    return {
+        "scenario": name,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "status_codes": dict(status_codes),
+        "rps": round(args.requests / wall_time, 1),
+        "latency_ms": percentiles(durations_ms),
+        "loop_lag_ms": await monitor.stop(),
+    }
+
+
+async def main(args) -> dict:
+    configure_app(args)
+    pdfs = [build_pdf(args.pdf_pages, variant=variant) for variant in range(args.distinct_inputs)]
+    transport = httpx.ASGITransport(app=server.app)
+    results = []
+
+    # httpx's ASGI transport does not send lifespan events, so run the handler directly
+    async with server.app.router.lifespan_context(server.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            async def customize(index: int) -> httpx.Response:
+                return await client.post("/api/customize-resume", json={
+                    "resume_text": resume_text(index % args.distinct_inputs),
+                    "job_description": JOB_DESCRIPTION,
+                    "session_id": f"bench-session-{index % args.sessions}"
+                })
+
+            async def extract_pdf(index: int) -> httpx.Response:
+                return await client.post(
+                    "/api/extract-pdf",
+                    files={"file": ("resume.pdf", pdfs[index % len(pdfs)], "application/pdf")}
+                )
+
+            async def history(index: int) -> httpx.Response:
+                return await client.get(f"/api/history/bench-session-{index % args.sessions}", params={"limit": 10})
+
+            senders = {"customize": customize, "extract-pdf": extract_pdf, "history": history}
+            for scenario in args.scenarios:
+                if scenario == "history":
+                    # Make rows from earlier scenarios visible before reading them back
+                    await server.history_writer.flush()
+                results.append(await drive(scenario, senders[scenario], args))
+
+    return {
+        "benchmark": "load_test",
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "distinct_inputs": args.distinct_inputs,
+            "sessions": args.sessions,
+            "llm_latency_s": args.llm_latency,
+            "llm_tokens_per_second": args.llm_tokens_per_second,
+            "llm_completion_tokens": args.llm_completion_tokens,
+            "llm_limit": args.llm_limit,
+            "pdf_pages": args.pdf_pages,
+            "llm_faults": {
+                "error_rate": args.llm_error_rate,
+                "rate_limit_rate": args.llm_rate_limit_rate,
+                "stall_rate": args.llm_stall_rate,
+                "slow_rate": args.llm_slow_rate,
+                "slow_latency_s": args.llm_slow_latency,
+            },
+        },
+        "results": results,
+        "llm_resilience": server.llm_caller.stats(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--distinct-inputs", type=int, default=50,
+                        help="Distinct resumes and PDFs cycled through; lower it to exercise the caches")
+    parser.add_argument("--sessions", type=int, default=10, help="Session ids spread across requests")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake LLM time to first token, seconds")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--llm-completion-tokens", type=int, default=300)
+    parser.add_argument("--llm-limit", type=int, default=None, help="Override the initial LLM concurrency limit")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of fake LLM calls failing with 503")
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0, help="Fraction failing with 429")
+    parser.add_argument("--llm-stall-rate", type=float, default=0.0, help="Fraction that hang instead of answering")
+    parser.add_argument("--llm-slow-rate", type=float, default=0.0, help="Fraction answering after --llm-slow-latency")
+    parser.add_argument("--llm-slow-latency", type=float, default=5.0)
+    parser.add_argument("--llm-attempt-timeout", type=float, default=None, help="Override LLM_ATTEMPT_TIMEOUT_SECONDS")
+    parser.add_argument("--llm-deadline-seconds", type=float, default=None, help="Override LLM_DEADLINE_SECONDS")
+    parser.add_argument("--llm-max-retries", type=int, default=None, help="Override LLM_MAX_RETRIES")
+    parser.add_argument("--llm-backoff-seconds", type=float, default=None, help="Override LLM_RETRY_BACKOFF_SECONDS")
+    parser.add_argument("--llm-hedge-percentile", type=float, default=None, help="Override LLM_HEDGE_PERCENTILE")
+    parser.add_argument("--llm-breaker-failures", type=int, default=None, help="Override LLM_BREAKER_FAILURES")
+    parser.add_argument("--pdf-pages", type=int, default=2)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
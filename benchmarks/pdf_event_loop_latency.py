@@ -0,0 +1,86 @@
+"""Event-loop lag while large PDFs are parsed concurrently.
+
+Compares parsing inline on the event loop (the previous /api/extract-pdf
+behaviour) with the process pool, and prints the results as JSON:
+
+    python -m benchmarks.pdf_event_loop_latency --pages 100 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from benchmarks._common import LoopLagMonitor
+from benchmarks.pdf_fixtures import build_pdf
+from pdf_extraction import PDFExtractionPool, extract_pdf_text
+
+
+async def run_inline(pdf_content: bytes, concurrency: int, max_pages: int) -> None:
+    async def parse():
+        extract_pdf_text(pdf_content, max_pages)
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*[parse() for _ in range(concurrency)])
+
+
+async def run_pool(pool: PDFExtractionPool, pdf_content: bytes, concurrency: int) -> None:
+    await asyncio.gather(*[pool.extract(pdf_content) for _ in range(concurrency)])
+
+
+async def measure(mode: str, pdf_content: bytes, args, pool: PDFExtractionPool = None) -> dict:
+    monitor = LoopLagMonitor()
+    monitor.start()
+    # Let the monitor collect a baseline before the load starts
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    if mode == "inline":
+        await run_inline(pdf_content, args.concurrency, args.pages)
+    else:
+        await run_pool(pool, pdf_content, args.concurrency)
+    wall_time = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "wall_time_s": round(wall_time, 3),
+        "loop_lag_ms": await monitor.stop(),
+    }
+
+
+async def main(args) -> dict:
+    pdf_content = build_pdf(args.pages)
+    pool = PDFExtractionPool(
+        max_workers=args.workers,
+        max_queue=max(args.concurrency, 1),
+        timeout_seconds=120,
+        max_bytes=len(pdf_content),
+        max_pages=args.pages
+    )
+    pool.start()
+    try:
+        # Wait for the pool to finish spawning so startup is not measured
+        await pool.extract(build_pdf(1))
+        results = [
+            await measure("inline", pdf_content, args),
+            await measure("pool", pdf_content, args, pool),
+        ]
+    finally:
+        pool.stop()
+
+    return {
+        "benchmark": "pdf_event_loop_latency",
+        "pages": args.pages,
+        "pdf_bytes": len(pdf_content),
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
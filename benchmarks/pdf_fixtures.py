@@ -0,0 +1,75 @@
+"""Synthetic resumes, job descriptions and multi-page PDFs for the benchmarks"""
+from typing import Optional
+
+
+SAMPLE_LINES = [
+    "Senior Software Engineer | Acme Corp | 2019 - Present",
+    "Designed and operated Python and Node.js microservices on AWS and Kubernetes.",
+    "Cut p99 API latency by 45% through caching, batching and query optimization.",
+    "Led migration from a monolith to event-driven services using Kafka and Docker.",
+    "Mentored five engineers and ran code reviews in an agile, Scrum-based team.",
+    "Built CI/CD pipelines with GitHub Actions, Terraform and automated testing.",
+]
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+We are looking for a Senior Backend Engineer to design and scale Python microservices.
+Requirements: Python, FastAPI, MongoDB, Redis, Docker, Kubernetes, AWS and CI/CD.
+Experience with event-driven architecture, Kafka and observability (Prometheus, Grafana).
+Strong communication skills and experience mentoring engineers in an agile team."""
+
+
+def resume_text(variant: int) -> str:
+    return "Jane Doe\nSenior Software Engineer\n\nExperience\n" + "\n".join(
+        f"- {line}" for line in SAMPLE_LINES
+    ) + f"\n\nProjects\n- Side project #{variant}"
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages: int, lines_per_page: int = 40, variant: Optional[int] = None) -> bytes:
+    """Build a valid text PDF with the given number of pages.
+
+    A ``variant`` number is written into a PDF comment, so otherwise identical
+    documents get different bytes (and digests) without changing their text.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    page_refs = []
+    for page_number in range(pages):
+        lines = [
+            f"{page_number + 1}.{line_number + 1} {SAMPLE_LINES[line_number % len(SAMPLE_LINES)]}"
+            for line_number in range(lines_per_page)
+        ]
+        body = "BT /F1 9 Tf 40 770 Td 11 TL " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+
+    kids = b" ".join(b"%d 0 R" % ref for ref in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    output = bytearray(b"%PDF-1.4\n")
+    if variant is not None:
+        output += b"%% variant %d\n" % variant
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
@@ -0,0 +1,142 @@
+"""Cold-start cost of the API: import time and time to first response.
+
+Every run starts a fresh interpreter and reports percentiles as JSON:
+
+    python -m benchmarks.startup_time --runs 5
+
+* ``import``: seconds to ``import server`` from the backend directory, plus
+  which heavy optional modules the import pulled in (they should all be
+  loaded lazily, so this list is expected to be empty).
+* ``server``: seconds from spawning uvicorn on benchmarks.stub_app until
+  ``/api/`` first answers, until ``/api/ready`` reports 200, and for the
+  first ``/api/customize-resume`` round trip after that (the fake LLM answers instantly).
+
+Run from the repository root. Needs the backend requirements plus
+benchmarks/requirements.txt.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks._common import BACKEND_DIR, percentiles
+
+
+REPO_DIR = BACKEND_DIR.parent
+
+# Dependencies that must not be loaded by ``import server`` alone
+LAZY_MODULES = ("motor", "pymongo", "PyPDF2", "emergentintegrations", "litellm", "openai")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import server
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+RESUME = "Jane Doe\nSoftware Engineer\n\nExperience\n- Built Python services on AWS\n\nSkills\nPython, Docker"
+JOB_DESCRIPTION = "Backend Engineer\nRequirements: Python, FastAPI, MongoDB, Kubernetes and AWS."
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "benchmark")
+    env["FAKE_LLM_LATENCY"] = "0"
+    env["FAKE_LLM_TOKENS_PER_SECOND"] = "0"
+    return env
+
+
+def measure_import() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_for(client: httpx.Client, process: subprocess.Popen, path: str, start: float, timeout: float) -> float:
+    """Poll ``path`` until it returns 200; seconds since ``start``"""
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"{path} did not answer 200 within {timeout}s")
+
+
+def measure_server(timeout: float) -> dict:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_DIR, env=child_env()
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            first_response = wait_for(client, process, "/api/", start, timeout)
+            ready = wait_for(client, process, "/api/ready", start, timeout)
+
+            request_start = time.perf_counter()
+            response = client.post("/api/customize-resume", json={
+                "resume_text": RESUME,
+                "job_description": JOB_DESCRIPTION
+            })
+            response.raise_for_status()
+            first_customization = time.perf_counter() - request_start
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    return {"first_response": first_response, "ready": ready, "first_customization": first_customization}
+
+
+def summarize(runs: List[dict], key: str) -> Dict[str, float]:
+    seconds = [run[key] for run in runs]
+    return {**percentiles(seconds), "min": round(min(seconds), 3)}
+
+
+def main(args) -> dict:
+    imports = [measure_import() for _ in range(args.runs)]
+    servers = [measure_server(args.timeout) for _ in range(args.runs)]
+
+    return {
+        "benchmark": "startup_time",
+        "runs": args.runs,
+        "import_seconds": summarize(imports, "seconds"),
+        "eagerly_loaded": sorted({module for run in imports for module in run["loaded"]}),
+        "first_response_seconds": summarize(servers, "first_response"),
+        "ready_seconds": summarize(servers, "ready"),
+        "first_customization_seconds": summarize(servers, "first_customization"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the server to come up")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = main(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,35 @@
+"""The API with FakeLlmChat and mongomock_motor, for benchmarks that need a real server process:
+
+    uvicorn benchmarks.stub_app:app --port 8001
+
+Run from the repository root. FAKE_LLM_LATENCY, FAKE_LLM_TOKENS_PER_SECOND and
+FAKE_LLM_COMPLETION_TOKENS tune the fake model; FAKE_LLM_ERROR_RATE,
+FAKE_LLM_RATE_LIMIT_RATE, FAKE_LLM_STALL_RATE, FAKE_LLM_SLOW_RATE and
+FAKE_LLM_SLOW_LATENCY inject upstream faults (see FakeLlmChat).
+"""
+import os
+
+import benchmarks._common  # noqa: F401  (puts backend/ on sys.path)
+from benchmarks.fake_llm import install_fake_llm
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+os.environ.setdefault("EMERGENT_LLM_KEY", "sk-benchmark")
+
+import server  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+
+install_fake_llm(
+    latency=float(os.environ.get("FAKE_LLM_LATENCY", "0.5")),
+    tokens_per_second=float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "200")),
+    completion_tokens=int(os.environ.get("FAKE_LLM_COMPLETION_TOKENS", "300")),
+    error_rate=float(os.environ.get("FAKE_LLM_ERROR_RATE", "0")),
+    rate_limit_rate=float(os.environ.get("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+    stall_rate=float(os.environ.get("FAKE_LLM_STALL_RATE", "0")),
+    slow_rate=float(os.environ.get("FAKE_LLM_SLOW_RATE", "0")),
+    slow_latency=float(os.environ.get("FAKE_LLM_SLOW_LATENCY", "5"))
+)
+server.create_mongo_client = AsyncMongoMockClient
+
+app = server.app
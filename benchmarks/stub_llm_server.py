@@ -0,0 +1,77 @@
+"""Minimal OpenAI-compatible chat completions server for local benchmarks"""
+import asyncio
+import json
+import time
+
+
+class StubLLMServer:
+    """Answers every POST with a fixed chat completion after ``latency`` seconds.
+
+    Speaks just enough HTTP/1.1 (Content-Length bodies, keep-alive) for
+    httpx clients, and counts TCP connections so connection reuse is visible.
+    """
+
+    def __init__(self, latency: float = 0.0, completion: str = "Optimized resume text"):
+        self.latency = latency
+        self.completion = completion
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+        self.port = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1/chat/completions"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _body(self) -> bytes:
+        return json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.completion},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                await reader.readexactly(int(headers.get("content-length", "0")))
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                body = self._body()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\nConnection: %s\r\n\r\n%s"
+                    % (len(body), b"keep-alive" if keep_alive else b"close", body)
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,141 @@
+"""Peak memory of the API process while large PDFs are uploaded concurrently.
+
+For each concurrency level a fresh uvicorn runs benchmarks.stub_app, takes
+that many simultaneous /api/extract-pdf uploads of one large PDF (distinct
+bytes per upload, so the PDF cache never answers), and reports the API
+process's peak RSS above its idle baseline, in total and per concurrent
+upload, as JSON:
+
+    python -m benchmarks.upload_memory --pdf-mb 20 --concurrency 1 4 8
+
+Only the API process is measured; parsing happens in the PDF pool's worker
+processes. Peak RSS is read from /proc (VmHWM, reset through clear_refs), so
+this runs on Linux only. Run from the repository root with the backend
+requirements plus benchmarks/requirements.txt.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+
+from benchmarks._common import BACKEND_DIR, percentiles
+from benchmarks.pdf_fixtures import build_pdf
+from benchmarks.startup_time import child_env, free_port, wait_for
+
+
+REPO_DIR = BACKEND_DIR.parent
+
+# Text lines per generated page; about 3 KB of PDF each
+LINES_PER_PAGE = 40
+
+
+def rss_kb(pid: int, field: str) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def reset_peak_rss(pid: int) -> None:
+    # Writing 5 resets VmHWM to the current RSS
+    with open(f"/proc/{pid}/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+async def upload_all(base_url: str, pdfs: List[bytes], timeout: float) -> dict:
+    durations_ms: List[float] = []
+    status_codes = Counter()
+
+    async def upload(client: httpx.AsyncClient, pdf: bytes) -> None:
+        start = time.perf_counter()
+        try:
+            # Only the first page is read, so parsing stays cheap and upload handling dominates
+            response = await client.post(
+                "/api/extract-pdf", params={"max_pages": 1},
+                files={"file": ("resume.pdf", pdf, "application/pdf")}
+            )
+            status_codes[str(response.status_code)] += 1
+        except Exception as e:
+            status_codes[type(e).__name__] += 1
+        durations_ms.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=len(pdfs))
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*[upload(client, pdf) for pdf in pdfs])
+    return {"status_codes": dict(status_codes), "latency_ms": percentiles(durations_ms)}
+
+
+def measure(concurrency: int, pages: int, args) -> dict:
+    pdfs = [build_pdf(pages, LINES_PER_PAGE, variant=index) for index in range(concurrency)]
+    port = free_port()
+    env = child_env()
+    env.update({
+        "PDF_MAX_BYTES": str(max(len(pdf) for pdf in pdfs)),
+        "PDF_POOL_MAX_QUEUE": str(concurrency),
+        "PDF_TIMEOUT_SECONDS": str(args.timeout),
+        "JOB_WORKERS": "0",
+    })
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base_url, timeout=args.timeout) as client:
+            wait_for(client, process, "/api/ready", start, args.timeout)
+            # Import PyPDF2 and the multipart parser before taking the baseline
+            client.post("/api/extract-pdf", files={"file": ("warmup.pdf", build_pdf(1), "application/pdf")})
+
+        baseline_kb = rss_kb(process.pid, "VmRSS")
+        reset_peak_rss(process.pid)
+        run = asyncio.run(upload_all(base_url, pdfs, args.timeout))
+        peak_kb = rss_kb(process.pid, "VmHWM")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    growth_mb = (peak_kb - baseline_kb) / 1024
+    return {
+        "concurrency": concurrency,
+        "baseline_rss_mb": round(baseline_kb / 1024, 1),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "peak_growth_mb": round(growth_mb, 1),
+        "peak_growth_per_upload_mb": round(growth_mb / concurrency, 2),
+        **run,
+    }
+
+
+def main(args) -> dict:
+    sample = build_pdf(10, LINES_PER_PAGE)
+    pages = max(1, round(args.pdf_mb * 1024 * 1024 * 10 / len(sample)))
+    pdf_bytes = len(build_pdf(pages, LINES_PER_PAGE))
+
+    return {
+        "benchmark": "upload_memory",
+        "config": {"pdf_mb": round(pdf_bytes / (1024 * 1024), 1), "pages": pages},
+        "results": [measure(concurrency, pages, args) for concurrency in args.concurrency],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf-mb", type=float, default=20.0, help="Approximate size of each uploaded PDF")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8],
+                        help="Simultaneous uploads per run")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed for startup and each upload")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = main(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
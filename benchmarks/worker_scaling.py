@@ -0,0 +1,171 @@
+"""Throughput of the API under gunicorn as the number of worker processes grows.
+
+Starts backend/gunicorn.conf.py on benchmarks.stub_app (fake LLM, mongomock)
+with 1..N workers and drives it from separate load-generator processes for
+a fixed duration, then prints RPS per worker count with the speedup and
+scaling efficiency over one worker as JSON:
+
+    python -m benchmarks.worker_scaling --max-workers 4 --duration 10
+
+Scenarios: score (/api/score against several job descriptions; pure CPU)
+and customize (/api/customize-resume with a distinct resume per request, so
+every call runs compaction, the fake LLM and keyword analysis). Each worker
+has its own mongomock database here, so only CPU-side scaling is measured.
+Scaling is bounded by the cores left over by the load generators; run it on
+a machine with at least twice as many cores as ``--max-workers``. Run from
+the repository root with the backend requirements plus
+benchmarks/requirements.txt.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+from benchmarks._common import BACKEND_DIR, percentiles
+from benchmarks.pdf_fixtures import JOB_DESCRIPTION, resume_text
+from benchmarks.startup_time import free_port, wait_for
+
+
+REPO_DIR = BACKEND_DIR.parent
+
+SCENARIOS = ("score", "customize")
+
+
+def request_for(scenario: str, client_index: int, index: int) -> Dict:
+    if scenario == "score":
+        return {
+            "url": "/api/score",
+            "json": {
+                "resume_text": resume_text(index),
+                "job_descriptions": [f"{JOB_DESCRIPTION}\nPosting {number}" for number in range(10)]
+            }
+        }
+    return {
+        "url": "/api/customize-resume",
+        "json": {
+            # Distinct per request so the caches never answer
+            "resume_text": resume_text(client_index * 1_000_000 + index),
+            "job_description": JOB_DESCRIPTION
+        }
+    }
+
+
+async def generate_load(base_url: str, scenario: str, client_index: int, concurrency: int,
+                        duration: float) -> dict:
+    durations_ms: List[float] = []
+    status_codes = Counter()
+    deadline = time.perf_counter() + duration
+    counter = iter(range(sys.maxsize))
+
+    async def user(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            request = request_for(scenario, client_index, next(counter))
+            start = time.perf_counter()
+            try:
+                response = await client.post(request["url"], json=request["json"])
+                status_codes[str(response.status_code)] += 1
+            except Exception as e:
+                status_codes[type(e).__name__] += 1
+            durations_ms.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await asyncio.gather(*[user(client) for _ in range(concurrency)])
+    return {"durations_ms": durations_ms, "status_codes": dict(status_codes)}
+
+
+def load_process(arguments: tuple) -> dict:
+    return asyncio.run(generate_load(*arguments))
+
+
+def measure(workers: int, args) -> dict:
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "WEB_CONCURRENCY": str(workers),
+        "FAKE_LLM_LATENCY": str(args.llm_latency),
+        "FAKE_LLM_TOKENS_PER_SECOND": "0",
+        "JOB_WORKERS": "0",
+    })
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "benchmarks.stub_app:app",
+         "-c", str(BACKEND_DIR / "gunicorn.conf.py"), "--bind", f"127.0.0.1:{port}", "--log-level", "warning"],
+        cwd=REPO_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base_url, timeout=args.timeout) as client:
+            wait_for(client, process, "/api/ready", start, args.timeout)
+        # Give the remaining workers time to finish their own startup
+        time.sleep(args.warmup)
+
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.clients) as pool:
+            runs = pool.map(load_process, [
+                (base_url, args.scenario, index, args.concurrency, args.duration) for index in range(args.clients)
+            ])
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    durations_ms = [sample for run in runs for sample in run["durations_ms"]]
+    status_codes = Counter()
+    for run in runs:
+        status_codes.update(run["status_codes"])
+    return {
+        "workers": workers,
+        "requests": len(durations_ms),
+        "status_codes": dict(status_codes),
+        "rps": round(status_codes.get("200", 0) / args.duration, 1),
+        "latency_ms": percentiles(durations_ms),
+    }
+
+
+def main(args) -> dict:
+    results = [measure(workers, args) for workers in range(1, args.max_workers + 1)]
+    baseline = results[0]["rps"] or 1.0
+    for result in results:
+        result["speedup"] = round(result["rps"] / baseline, 2)
+        result["efficiency"] = round(result["rps"] / (baseline * result["workers"]), 2)
+
+    return {
+        "benchmark": "worker_scaling",
+        "config": {
+            "scenario": args.scenario,
+            "duration_s": args.duration,
+            "clients": args.clients,
+            "concurrency_per_client": args.concurrency,
+            "llm_latency_s": args.llm_latency,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=SCENARIOS, default="score")
+    parser.add_argument("--max-workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--clients", type=int, default=2, help="Load-generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests per load generator")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM time to first token, seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds to wait after the first ready response")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the server to come up")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = main(args)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,16 @@
+"""Shared pytest setup: backend modules are imported the way uvicorn loads them"""
+import benchmarks._common  # noqa: F401  (puts backend/ on sys.path)
+import pytest
+
+from benchmarks.fake_llm import FakeLlmChat
+
+
+@pytest.fixture
+def fake_llm():
+    """FakeLlmChat answering in 10 ms with no injected faults"""
+    FakeLlmChat.configure(
+        latency=0.01, tokens_per_second=0, completion_tokens=20, chunk_tokens=8,
+        error_rate=0.0, rate_limit_rate=0.0, stall_rate=0.0, slow_rate=0.0,
+        stall_seconds=3600.0, slow_latency=5.0, fault_script=[], calls=0, faults=0
+    )
+    return FakeLlmChat
@@ -0,0 +1,84 @@
+"""Upload type sniffing while a multipart body is still arriving"""
+import asyncio
+
+from fastapi import FastAPI, File, UploadFile
+
+from body_limits import UploadSignatureMiddleware, first_file_part
+
+
+BOUNDARY = b"sniffboundary"
+
+
+def multipart_body(content: bytes) -> bytes:
+    return (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="a.pdf"\r\n'
+        b"Content-Type: application/pdf\r\n\r\n" + content + b"\r\n"
+        b"--" + BOUNDARY + b"--\r\n"
+    )
+
+
+def make_app() -> tuple[FastAPI, list]:
+    uploads = []
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        uploads.append(len(await file.read()))
+        return {"ok": True}
+
+    app.add_middleware(UploadSignatureMiddleware, signatures={"/upload": (b"%PDF-", "File is not a PDF")})
+    return app, uploads
+
+
+def post_in_chunks(app: FastAPI, body: bytes, chunk_size: int = 512) -> tuple[int, int]:
+    """Send the body in chunks; returns the status code and how many chunks the app read"""
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/upload", "raw_path": b"/upload", "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY)],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    read = 0
+    status = []
+
+    async def receive():
+        nonlocal read
+        read += 1
+        if read > len(chunks):
+            return {"type": "http.disconnect"}
+        return {"type": "http.request", "body": chunks[read - 1], "more_body": read < len(chunks)}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    asyncio.run(app(scope, receive, send))
+    return status[0], read
+
+
+def test_rejects_a_non_pdf_before_the_rest_of_the_body():
+    app, uploads = make_app()
+    status, chunks_read = post_in_chunks(app, multipart_body(b"GIF89a" + b"x" * 100_000))
+
+    assert status == 400
+    assert chunks_read <= 4
+    assert uploads == []
+
+
+def test_passes_a_pdf_through():
+    app, uploads = make_app()
+    status, _ = post_in_chunks(app, multipart_body(b"%PDF-1.4\n" + b"x" * 100_000))
+
+    assert status == 200
+    assert uploads == [100_009]
+
+
+def test_first_file_part_waits_for_complete_headers():
+    body = multipart_body(b"%PDF-1.4")
+    headers_end = body.index(b"\r\n\r\n")
+
+    assert first_file_part(body[:headers_end], BOUNDARY) is None
+    assert first_file_part(body[:headers_end + 8], BOUNDARY) == (b"%PDF", False)
+    assert first_file_part(body, BOUNDARY) == (b"%PDF-1.4", True)
@@ -0,0 +1,40 @@
+"""Repeated-line removal in prompt compaction"""
+import pytest
+
+from compaction import compact_resume, remove_repeated_lines
+
+
+@pytest.mark.parametrize("dates", ["2019 - 2021", "2019-2021", "Jan 2019 – Mar 2021", "2019 – Present", "01/2019 - 12/2021"])
+def test_keeps_identical_date_lines_of_two_jobs(dates):
+    resume = "\n".join([
+        "Jane Doe",
+        "Senior Engineer, Acme",
+        dates,
+        "Built the billing service",
+        "Consultant, Initech",
+        dates,
+        "Migrated reports to Python",
+    ])
+
+    assert remove_repeated_lines(resume).split("\n").count(dates) == 2
+
+
+def test_drops_repeated_running_headers():
+    page = "Jane Doe\n{header}\nEngineer, Acme\n2019 - 2021\n{page}"
+    resume = "\n".join([
+        page.format(header="+1 (555) 123-4567 | jane@example.com", page="1"),
+        page.format(header="+1 (555) 123-4567 | jane@example.com", page="2").replace("Acme", "Initech"),
+    ])
+
+    lines = compact_resume(resume).split("\n")
+    assert lines.count("+1 (555) 123-4567 | jane@example.com") == 1
+    assert lines.count("Jane Doe") == 1
+    assert lines.count("2019 - 2021") == 2
+    assert "1" not in lines and "2" not in lines
+
+
+def test_phone_number_next_to_a_year_range_is_a_header():
+    footer = "2015 - 2019 · 555-123-4567"
+    resume = f"Jane Doe\nEngineer\n{footer}\nConsultant\n{footer}"
+
+    assert remove_repeated_lines(resume).split("\n").count(footer) == 1
@@ -0,0 +1,54 @@
+"""Streamed PDF extraction through the process pool"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from benchmarks.pdf_fixtures import build_pdf
+from pdf_extraction import PDFExtractionPool
+
+
+@pytest.fixture
+def pool():
+    pool = PDFExtractionPool(max_workers=1, max_queue=4, timeout_seconds=30.0, max_bytes=10 * 1024 * 1024, max_pages=50)
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+def read_stream(pool: PDFExtractionPool, source, **limits) -> tuple[int, list]:
+    async def scenario():
+        page_count, pages = await pool.stream(source, **limits)
+        return page_count, [text async for text in pages]
+
+    return asyncio.run(scenario())
+
+
+def test_pages_come_back_from_a_worker(pool):
+    page_count, pages = read_stream(pool, build_pdf(3), max_pages=2)
+
+    assert page_count == 3
+    assert len(pages) == 2
+    assert all(text.startswith(f"{number}.1 ") for number, text in enumerate(pages, start=1))
+
+
+def test_unreadable_pdf_is_a_400(pool):
+    with pytest.raises(HTTPException) as raised:
+        read_stream(pool, b"%PDF-1.4 not really a pdf")
+    assert raised.value.status_code == 400
+
+
+def test_full_queue_is_a_503(pool, monkeypatch):
+    monkeypatch.setattr(pool, "queue_depth", pool.max_queue)
+
+    with pytest.raises(HTTPException) as raised:
+        read_stream(pool, build_pdf(1))
+    assert raised.value.status_code == 503
+
+
+def test_deadline_is_a_504(pool, monkeypatch):
+    monkeypatch.setattr(pool, "timeout_seconds", 0.0)
+
+    with pytest.raises(HTTPException) as raised:
+        read_stream(pool, build_pdf(1))
+    assert raised.value.status_code == 504
@@ -0,0 +1,165 @@
+"""ResilientCaller and CircuitBreaker against FakeLlmChat's injected faults"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from benchmarks.fake_llm import FakeUserMessage
+from resilience import CircuitBreaker, ResilientCaller
+
+
+PROMPT = FakeUserMessage("RESUME:\nJane Doe\nPython developer\n\nJOB DESCRIPTION:\nBackend Engineer, Python, AWS")
+
+
+def make_caller(failure_threshold=5, recovery_seconds=30.0, **settings) -> ResilientCaller:
+    options = dict(
+        deadline_seconds=5.0, attempt_timeout=1.0, max_retries=2,
+        backoff_seconds=0.001, backoff_max_seconds=0.01
+    )
+    options.update(settings)
+    return ResilientCaller("Fake LLM", CircuitBreaker("Fake LLM", failure_threshold, recovery_seconds), **options)
+
+
+def send(fake_llm):
+    # A fresh chat per attempt, as server.send_llm_message does
+    return lambda: fake_llm().send_message(PROMPT)
+
+
+@pytest.mark.parametrize("fault", [503, 429])
+def test_retries_transient_errors(fake_llm, fault):
+    caller = make_caller()
+    fake_llm.configure(fault_script=[fault, fault])
+
+    assert asyncio.run(caller.call(send(fake_llm))).startswith("OPTIMIZED RESUME")
+    assert fake_llm.calls == 3
+    assert caller.retries == 2
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_gives_up_after_max_retries(fake_llm):
+    caller = make_caller(max_retries=2)
+    fake_llm.configure(error_rate=1.0)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(caller.call(send(fake_llm)))
+    assert raised.value.status_code == 502
+    assert fake_llm.calls == 3
+    assert caller.failures == 1
+
+
+def test_does_not_retry_other_errors(fake_llm):
+    caller = make_caller()
+
+    async def bad_request():
+        raise ValueError("prompt too long")
+
+    with pytest.raises(ValueError):
+        asyncio.run(caller.call(bad_request))
+    assert caller.retries == 0
+    assert caller.breaker.consecutive_failures == 0
+
+
+def test_retries_a_stalled_attempt_after_its_timeout(fake_llm):
+    caller = make_caller(attempt_timeout=0.1)
+    fake_llm.configure(fault_script=["stall"])
+
+    asyncio.run(caller.call(send(fake_llm)))
+    assert caller.retries == 1
+    assert fake_llm.calls == 2
+
+
+def test_times_out_at_the_deadline(fake_llm):
+    caller = make_caller(attempt_timeout=0.1, deadline_seconds=0.25, max_retries=10)
+    fake_llm.configure(stall_rate=1.0)
+
+    start = time.monotonic()
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(caller.call(send(fake_llm)))
+    assert raised.value.status_code == 504
+    assert time.monotonic() - start < 1.0
+
+
+def test_hedge_answers_for_a_stalled_attempt(fake_llm):
+    caller = make_caller(attempt_timeout=2.0, hedge_percentile=50, hedge_min_samples=3)
+
+    async def scenario():
+        for _ in range(3):
+            await caller.call(send(fake_llm))
+        assert caller.hedge_delay() is not None
+        fake_llm.configure(fault_script=["stall"])
+        start = time.monotonic()
+        await caller.call(send(fake_llm))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(scenario())
+    assert caller.hedges == 1
+    assert caller.hedge_wins == 1
+    assert caller.retries == 0
+    assert elapsed < 1.0
+
+
+def test_breaker_rejects_while_open(fake_llm):
+    caller = make_caller(failure_threshold=2, max_retries=0)
+    fake_llm.configure(error_rate=1.0)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            asyncio.run(caller.call(send(fake_llm)))
+    assert caller.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(caller.call(send(fake_llm)))
+    assert raised.value.status_code == 503
+    assert "Retry-After" in raised.value.headers
+    assert fake_llm.calls == 2
+    assert caller.breaker.short_circuited == 1
+
+
+def open_breaker(caller: ResilientCaller, fake_llm) -> None:
+    fake_llm.configure(error_rate=1.0)
+    with pytest.raises(HTTPException):
+        asyncio.run(caller.call(send(fake_llm)))
+    assert caller.breaker.state == CircuitBreaker.OPEN
+    time.sleep(caller.breaker.recovery_seconds)
+
+
+def test_half_open_probe_success_closes_the_breaker(fake_llm):
+    caller = make_caller(failure_threshold=1, recovery_seconds=0.05, max_retries=0)
+    open_breaker(caller, fake_llm)
+
+    # Asking whether a call would be admitted must not use up the probe
+    assert caller.breaker.allow()
+    assert caller.breaker.state == CircuitBreaker.OPEN
+
+    fake_llm.configure(error_rate=0.0)
+    asyncio.run(caller.call(send(fake_llm)))
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_probe_failure_reopens_the_breaker(fake_llm):
+    caller = make_caller(failure_threshold=1, recovery_seconds=0.05, max_retries=0)
+    open_breaker(caller, fake_llm)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(caller.call(send(fake_llm)))
+    assert raised.value.status_code == 502
+    assert caller.breaker.state == CircuitBreaker.OPEN
+    assert caller.breaker.opened == 2
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(caller.call(send(fake_llm)))
+    assert raised.value.status_code == 503
+
+
+def test_abandoned_probe_goes_to_the_next_caller(fake_llm):
+    caller = make_caller(failure_threshold=1, recovery_seconds=0.05, max_retries=0)
+    open_breaker(caller, fake_llm)
+
+    # e.g. a limiter rejection: the probe ends without reaching the upstream
+    assert caller.breaker.check() is True
+    caller.breaker.abandon()
+
+    fake_llm.configure(error_rate=0.0)
+    asyncio.run(caller.call(send(fake_llm)))
+    assert caller.breaker.state == CircuitBreaker.CLOSED
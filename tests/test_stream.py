@@ -0,0 +1,73 @@
+"""/api/customize-resume/stream in process, with FakeLlmChat and mongomock"""
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+# server.py reads these at import time; the client is swapped for mongomock below
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("PDF_POOL_WORKERS", "1")
+
+import llm_clients  # noqa: E402
+import server  # noqa: E402
+from benchmarks.fake_llm import FakeUserMessage  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+
+PAYLOAD = {
+    "resume_text": "Jane Doe\nSoftware Engineer\nBuilt REST APIs in Python and deployed them on AWS.",
+    "job_description": "Backend Engineer\nWe need Python, AWS, Docker and Kubernetes experience."
+}
+
+
+@pytest.fixture
+def app(monkeypatch, fake_llm):
+    monkeypatch.setattr(llm_clients, "LlmChat", fake_llm)
+    monkeypatch.setattr(llm_clients, "UserMessage", FakeUserMessage)
+    monkeypatch.setattr(server, "create_mongo_client", AsyncMongoMockClient)
+    monkeypatch.setattr(server.llm_factory, "api_key", "sk-test")
+    return server.app
+
+
+def stream_events(app, payload: dict) -> list:
+    async def post() -> str:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/api/customize-resume/stream", json=payload)
+                assert response.status_code == 200
+                return response.text
+
+    events = []
+    for block in asyncio.run(post()).strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_sends_chunks_before_done(app, fake_llm):
+    fake_llm.configure(completion_tokens=40, chunk_tokens=8)
+    events = stream_events(app, PAYLOAD)
+
+    names = [name for name, _ in events]
+    assert names == ["token"] * 5 + ["done"]
+    text = "".join(data["text"] for name, data in events if name == "token")
+    assert text == fake_llm().completion(server.USER_PROMPT_TEMPLATE.format(**PAYLOAD))
+    assert {"improvements", "keywords_added", "session_id"} <= set(events[-1][1])
+
+
+def test_stream_falls_back_to_one_chunk_without_stream_message(app, fake_llm, monkeypatch):
+    class BlockingChat(fake_llm):
+        # Like emergentintegrations' LlmChat: only send_message
+        stream_message = None
+
+        async def send_message(self, user_message) -> str:
+            return self.completion(user_message.text)
+
+    monkeypatch.setattr(llm_clients, "LlmChat", BlockingChat)
+    events = stream_events(app, {**PAYLOAD, "resume_text": PAYLOAD["resume_text"] + "\nGo"})
+
+    assert [name for name, _ in events] == ["token", "done"]